@@ -22,12 +22,21 @@
 
 
 import argparse
+import bisect
 import datetime
+import heapq
+import mmap
+import os
+import pickle
 import re
-import shelve
-from itertools import chain, groupby, islice
-
-from lxml import etree, html
+import struct
+import sys
+import time
+from array import array
+from collections import Counter, OrderedDict
+from collections.abc import Sequence
+from itertools import accumulate, chain, combinations, groupby, islice, repeat
+from operator import itemgetter
 
 __program__ = 'bea'
 __description__ = 'Blogger Export Analyzer'
@@ -39,7 +48,65 @@ __version__ = '0.2.2'
 __website__ = 'http://s.yjl.im/bea'
 
 
-CACHE_VERSION = 1
+CACHE_VERSION = 6
+CACHE_MAGIC = b'BEA\0'
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+ATOM_ENTRY = ATOM + 'entry'
+ATOM_ID = ATOM + 'id'
+ATOM_UPDATED = ATOM + 'updated'
+EXTRACT_BATCH_SIZE = 256
+
+
+def lazy_import(name):
+  '''Return module name, which is executed when its attribute is first
+  accessed, or None if it isn't installed
+
+  Pythons without importlib.util.LazyLoader, before 3.5, import it at once.'''
+
+  import importlib
+  import importlib.util
+
+  if name in sys.modules:
+    return sys.modules[name]
+  if not hasattr(importlib.util, 'LazyLoader'):
+    try:
+      return importlib.import_module(name)
+    except ImportError:
+      return None
+  spec = importlib.util.find_spec(name)
+  if spec is None:
+    return None
+  spec.loader = importlib.util.LazyLoader(spec.loader)
+  module = sys.modules[name] = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+
+numpy = lazy_import('numpy')
+NUMPY_MIN_SIZE = 100000
+
+
+def numpy_for(size):
+  '''Return numpy if it is installed and worth importing for size items'''
+
+  return numpy if size >= NUMPY_MIN_SIZE else None
+
+
+class memoized(object):
+  '''Decorator of a method, whose result is memoized as an attribute'''
+
+  def __init__(self, func):
+
+    self.func = func
+    self.__doc__ = func.__doc__
+
+  def __get__(self, obj, cls):
+
+    if obj is None:
+      return self
+    value = obj.__dict__[self.func.__name__] = self.func(obj)
+    return value
 
 
 def list_it(d, tag, item):
@@ -50,6 +117,37 @@ def list_it(d, tag, item):
     d[tag] = [item]
 
 
+def parse_timestamp(s):
+  '''Return the datetime of timestamp s
+
+  Blogger's timestamps have fixed format like 2012-04-16T10:20:00.000-07:00,
+  which is parsed by fromisoformat or sliced by hand when fromisoformat isn't
+  available, other formats are left to strptime.'''
+
+  if len(s) == 29 and s[19] == '.' and s[23] in '+-' and s[26] == ':':
+    try:
+      return parse_fixed_timestamp(s)
+    except ValueError:
+      pass
+  s = s.replace(':', '')
+  if '.' in s:
+    return datetime.datetime.strptime(s, '%Y-%m-%dT%H%M%S.%f%z')
+  return datetime.datetime.strptime(s, '%Y-%m-%dT%H%M%S%z')
+
+
+def slice_timestamp(s):
+  '''Return the datetime of timestamp s in fixed format by slicing'''
+
+  offset = int(s[24:26]) * 3600 + int(s[27:29]) * 60
+  return datetime.datetime(
+    int(s[0:4]), int(s[5:7]), int(s[8:10]),
+    int(s[11:13]), int(s[14:16]), int(s[17:19]), int(s[20:23]) * 1000,
+    timezone(-offset if s[23] == '-' else offset))
+
+
+parse_fixed_timestamp = getattr(datetime.datetime, 'fromisoformat', slice_timestamp)
+
+
 def to_dict(e):
 
   tag = e.tag.replace('{%s}' % e.nsmap[e.prefix], '')
@@ -63,7 +161,7 @@ def to_dict(e):
         d['text'] = e.text
       return d, tag
     if tag in ['published', 'updated']:
-      return datetime.datetime.strptime(e.text.replace(':', ''), '%Y-%m-%dT%H%M%S.%f%z'), tag
+      return parse_timestamp(e.text), tag
     return e.text, tag
 
   for _c, _tag in (to_dict(c) for c in children):
@@ -74,26 +172,7 @@ def to_dict(e):
         continue
       list_it(d, 'label', _c['term'])
     if _tag == 'entry':
-      scheme = _c['scheme']
-      del _c['scheme']
-      if scheme in ['comment', 'post']:
-        text = html.fromstring('<div>' + (_c['content'] or '') + '</div>').xpath('string()')
-        _c['text'] = text
-        words = text.split()
-        chars = sum(len(w) for w in words)
-        _c['words'] = len(words)
-        _c['chars'] = chars
-        if scheme == 'post':
-          # published doesn't have microseconds, but updated has, add new
-          # value with no microseconds
-          _c['updated_no_us'] = _c['updated'].replace(microsecond=0)
-          _c['updated_after'] = _c['updated_no_us'] - _c['published']
-      if 'control' in _c and _c['control']['draft'] == 'yes':
-        del _c['control']
-        list_it(d, 'draft', _c)
-        continue
-        # TODO possible other control value?
-      list_it(d, scheme, _c)
+      list_it(d, entry_kind(_c)[0], _c)
     elif _tag == 'content':
       d[_tag] = _c['text']
     # ignored tags, not really useful for analysis
@@ -102,6 +181,1829 @@ def to_dict(e):
   return d, tag
 
 
+def entry_kind(e):
+  '''Return the kind of entry e and whether its text needs to be extracted'''
+
+  scheme = e['scheme']
+  del e['scheme']
+  has_text = scheme in ['comment', 'post']
+  if 'control' in e and e['control']['draft'] == 'yes':
+    del e['control']
+    return 'draft', has_text
+    # TODO possible other control value?
+  return scheme, has_text
+
+
+def add_entry(f, kind, e):
+
+  if kind in Feed.KINDS:
+    f[kind].append(e)
+  else:
+    list_it(f, kind, e)
+
+
+def extract_text(content, terms=False):
+  '''Return the text, the number of words and characters of HTML content, and
+  the word frequency of the text if terms, otherwise None'''
+
+  from lxml import html
+
+  text = html.fromstring('<div>' + (content or '') + '</div>').xpath('string()')
+  words = text.split()
+  return text, len(words), sum(len(w) for w in words), word_freq(text) if terms else None
+
+
+def extract_texts(contents):
+
+  return [extract_text(*content) for content in contents]
+
+
+def add_entries(f, batch, texts):
+  '''Add entries in batch with extracted texts into Feed f
+
+  An entry is either a dict or a (Table, row) tuple of an unchanged entry.'''
+
+  texts = iter(texts)
+  for kind, e, has_text in batch:
+    if has_text:
+      e['text'], e['words'], e['chars'], e['terms'] = next(texts)
+    if isinstance(e, tuple):
+      f[kind].append_row(*e)
+    else:
+      add_entry(f, kind, e)
+
+
+def base_rows(base):
+  '''Return a dict of entry ID to (kind, Table, row) of entries in Feed base'''
+
+  rows = {}
+  for kind in Feed.KINDS:
+    table = base[kind]
+    for i, _id in enumerate(table.id):
+      rows[_id] = (kind, table, i)
+  return rows
+
+
+def threaded(iterable, depth):
+  '''Iterate iterable in a thread, yielding its items through a queue of at
+  most depth items'''
+
+  import queue
+  import threading
+
+  items = queue.Queue(depth)
+  done = object()
+
+  def run():
+
+    try:
+      for item in iterable:
+        items.put((item, None))
+      items.put((done, None))
+    except BaseException as e:
+      items.put((done, e))
+
+  thread = threading.Thread(target=run, daemon=True)
+  thread.start()
+  while True:
+    item, error = items.get()
+    if item is done:
+      thread.join()
+      if error is not None:
+        raise error
+      return
+    yield item
+
+
+def load_feed(filename, jobs=1, base=None, profile=None, added=None):
+  '''Load the exported XML file into a Feed
+
+  Entries are converted as soon as they are parsed, then they are removed from
+  the tree, so only one entry and the feed's own elements are kept in memory.
+
+  With more than one job, the loading is pipelined: a thread parses and
+  converts entries into batches, a process pool extracts texts from contents
+  of the batches, and the entries with their texts are added to the Feed in
+  order.  The stages are connected by queues of twice the number of processes
+  in batches, which bounds the memory.
+
+  If Feed base of a previous export is given, entries which have the same ID and
+  updated time in base are copied from it without conversion and extraction.
+
+  If added is given, it's called with the Feed after each batch is added, and
+  it may take the entries out of the Tables, which are sorted afterwards.
+  '''
+
+  from lxml import etree
+
+  if profile is None:
+    profile = NO_PROFILE
+  f = Feed()
+  rows = base_rows(base) if base else {}
+
+  f.source = stat_source(filename)
+  source = HashReader(open(filename, 'rb'))
+  xml = decompress(source)
+  context = etree.iterparse(xml, events=('end',), tag=ATOM_ENTRY)
+
+  def parse():
+
+    batch = []
+    for _, e in context:
+      row = rows.get(e.findtext(ATOM_ID))
+      updated = row and to_epoch(parse_timestamp(e.findtext(ATOM_UPDATED)))
+      if row and row[1].updated_key(row[2]) == updated:
+        batch.append((row[0], row[1:], False))
+      else:
+        with profile.phase('convert'):
+          _c, _ = to_dict(e)
+          kind, has_text = entry_kind(_c)
+        batch.append((kind, _c, has_text))
+      if len(batch) >= EXTRACT_BATCH_SIZE:
+        yield batch
+        batch = []
+      e.clear()
+      e.getparent().remove(e)
+    yield batch
+
+  def contents(batch):
+
+    return [(e['content'], kind == 'post') for kind, e, has_text in batch if has_text]
+
+  def add(batch, texts):
+    '''Add batch with the texts returned by calling texts'''
+
+    with profile.phase('extract'):
+      add_entries(f, batch, texts())
+    if added:
+      added(f)
+
+  if jobs == 1:
+    for batch in parse():
+      add(batch, lambda: extract_texts(contents(batch)))
+  else:
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    depth = 2 * (jobs or os.cpu_count() or 1)
+    pending = deque()
+    with ProcessPoolExecutor(jobs or None) as executor:
+      for batch in threaded(parse(), depth):
+        pending.append((batch, executor.submit(extract_texts, contents(batch))))
+        while pending and (len(pending) >= depth or pending[0][1].done()):
+          batch, future = pending.popleft()
+          add(batch, future.result)
+      while pending:
+        batch, future = pending.popleft()
+        add(batch, future.result)
+
+  f.source += (source.hexdigest(),)
+  xml.close()
+  source.close()
+
+  for kind in f.KINDS:
+    f[kind] = f[kind].sort_published()
+
+  d, _ = to_dict(context.root)
+  f.update(d)
+  return f
+
+
+# =======
+# Entries
+# =======
+
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+US = datetime.timedelta(microseconds=1)
+TIMEZONES = {}
+
+
+def to_epoch(dt):
+  '''Return microseconds since the epoch and UTC offset in seconds of dt'''
+
+  return (dt - EPOCH) // US, dt.utcoffset() // datetime.timedelta(seconds=1)
+
+
+def timezone(offset):
+  '''Return the timezone of UTC offset in seconds, which is reused'''
+
+  tz = TIMEZONES.get(offset)
+  if tz is None:
+    tz = TIMEZONES[offset] = datetime.timezone(datetime.timedelta(seconds=offset))
+  return tz
+
+
+def from_epoch(us, offset):
+  '''Return the datetime of microseconds since the epoch at UTC offset'''
+
+  return (EPOCH + datetime.timedelta(microseconds=us)).astimezone(timezone(offset))
+
+
+class Strings(list):
+  '''Interned strings, the index of a string is its ID'''
+
+  def __init__(self, iterable=()):
+
+    super().__init__(iterable)
+    self.ids = dict((s, i) for i, s in enumerate(self))
+
+  def __reduce__(self):
+
+    return Strings, (list(self),)
+
+  def intern(self, s):
+
+    i = self.ids.get(s)
+    if i is None:
+      i = self.ids[s] = len(self)
+      self.append(s)
+    return i
+
+
+def bisect_descending(a, x, lo=0):
+  '''Return the index of the first item less than x in descending sequence a'''
+
+  hi = len(a)
+  while lo < hi:
+    mid = (lo + hi) // 2
+    if a[mid] < x:
+      hi = mid
+    else:
+      lo = mid + 1
+  return lo
+
+
+class Table(object):
+  '''Columnar store of entries of one kind
+
+  Timestamps are microseconds since the epoch with UTC offsets in seconds,
+  authors and the posts which entries reply to are IDs of the feed's interned
+  strings, -1 for no reply.  LISTS are lists of values of entries, such as
+  labels, the values of entry i are values[offsets[i]:offsets[i + 1]].  Terms
+  of posts are the words in the text with their numbers of occurrences.
+
+  Entries of a loaded Feed are sorted by published time, newest first, as
+  Blogger exports posts, so entries published in a time range are a slice.
+  '''
+
+  NUMBERS = (
+    ('published', 'q'),
+    ('published_tz', 'i'),
+    ('updated', 'q'),
+    ('updated_tz', 'i'),
+    ('words', 'i'),
+    ('chars', 'i'),
+    ('author', 'i'),
+    ('reply_to', 'i'),
+  )
+  LISTS = (
+    ('label_offsets', ('label_ids', )),
+    ('term_offsets', ('term_ids', 'term_counts')),
+  )
+  TYPECODES = dict(NUMBERS)
+  TYPECODES.update((name, 'i') for offsets, values in LISTS for name in (offsets, ) + values)
+  STRINGS = ('id', 'title', 'text')
+
+  def __init__(self, strings):
+    '''Create an empty Table sharing the interned strings of a Feed or Table'''
+
+    for name in Feed.STRINGS:
+      setattr(self, name, getattr(strings, name))
+    for name, typecode in self.NUMBERS:
+      setattr(self, name, array(typecode))
+    for offsets, values in self.LISTS:
+      setattr(self, offsets, array('i', [0]))
+      for name in values:
+        setattr(self, name, array('i'))
+    for name in self.STRINGS:
+      setattr(self, name, [])
+
+  def __len__(self):
+
+    return len(self.id)
+
+  def append(self, e):
+
+    published, published_tz = to_epoch(e['published'])
+    updated, updated_tz = to_epoch(e['updated'])
+    self.published.append(published)
+    self.published_tz.append(published_tz)
+    self.updated.append(updated)
+    self.updated_tz.append(updated_tz)
+    self.words.append(e.get('words', 0))
+    self.chars.append(e.get('chars', 0))
+    self.author.append(self.authors.intern(e['author']['name']))
+    if 'in-reply-to' in e:
+      self.reply_to.append(self.refs.intern(e['in-reply-to']['ref']))
+    else:
+      self.reply_to.append(-1)
+    self.label_ids.extend(self.labels.intern(l) for l in e.get('label', []))
+    self.label_offsets.append(len(self.label_ids))
+    terms = e.get('terms') or {}
+    self.term_ids.extend(self.terms.intern(t) for t in terms)
+    self.term_counts.extend(terms.values())
+    self.term_offsets.append(len(self.term_ids))
+    self.id.append(e['id'])
+    self.title.append(e['title'] or '')
+    self.text.append(e.get('text', ''))
+
+  def append_row(self, table, i):
+    '''Append entry i of another Table'''
+
+    for name, _ in self.NUMBERS:
+      getattr(self, name).append(getattr(table, name)[i])
+    self.author[-1] = self.authors.intern(table.author_name(i))
+    ref = table.ref(i)
+    if ref is not None:
+      self.reply_to[-1] = self.refs.intern(ref)
+    self.label_ids.extend(self.labels.intern(l) for l in table.labels_of(i))
+    self.label_offsets.append(len(self.label_ids))
+    start, end = table.term_offsets[i], table.term_offsets[i + 1]
+    self.term_ids.extend(self.terms.intern(table.terms[t]) for t in table.term_ids[start:end])
+    self.term_counts.extend(table.term_counts[start:end])
+    self.term_offsets.append(len(self.term_ids))
+    for name in self.STRINGS:
+      getattr(self, name).append(getattr(table, name)[i])
+
+  def columns(self):
+    '''Return names and typecodes of columns, None typecode for strings'''
+
+    lists = tuple((name, 'i') for offsets, values in self.LISTS for name in (offsets, ) + values)
+    return self.NUMBERS + lists + tuple((name, None) for name in self.STRINGS)
+
+  def as_numpy(self, name):
+    '''Return numeric column name as a NumPy array without copying'''
+
+    return numpy.frombuffer(getattr(self, name), self.TYPECODES[name])
+
+  def take(self, rows):
+    '''Return a new Table of the entries at rows'''
+
+    t = Table(self)
+    if numpy_for(len(self)):
+      rows = numpy.fromiter(rows, numpy.int64)
+      for name, typecode in self.NUMBERS:
+        setattr(t, name, array(typecode, self.as_numpy(name)[rows].tobytes()))
+      for offsets, values in self.LISTS:
+        starts = self.as_numpy(offsets)[rows]
+        lengths = self.as_numpy(offsets)[rows + 1] - starts
+        getattr(t, offsets).extend(numpy.cumsum(lengths).tolist())
+        # index of each value: its start plus its position within the values
+        ends = numpy.asarray(getattr(t, offsets)[1:], numpy.int64)
+        index = numpy.repeat(starts - ends + lengths, lengths) + numpy.arange(ends[-1] if len(ends) else 0)
+        for name in values:
+          setattr(t, name, array('i', self.as_numpy(name)[index].tobytes()))
+      rows = rows.tolist()
+    else:
+      rows = list(rows)
+      for i in rows:
+        for name, _ in self.NUMBERS:
+          getattr(t, name).append(getattr(self, name)[i])
+        for offsets, values in self.LISTS:
+          start, end = getattr(self, offsets)[i], getattr(self, offsets)[i + 1]
+          for name in values:
+            getattr(t, name).extend(getattr(self, name)[start:end])
+          getattr(t, offsets).append(len(getattr(t, values[0])))
+    for name in self.STRINGS:
+      column = getattr(self, name)
+      setattr(t, name, [column[i] for i in rows])
+    return t
+
+  def slice(self, start, stop):
+    '''Return a new Table of the entries from row start to row stop
+
+    Columns are views of the columns of this Table, except the offsets of LISTS
+    which are rebased unless start is 0.'''
+
+    t = Table(self)
+    for name, _ in self.NUMBERS:
+      setattr(t, name, memoryview(getattr(self, name))[start:stop])
+    for offsets, values in self.LISTS:
+      column = memoryview(getattr(self, offsets))[start:stop + 1]
+      base, end = column[0], column[-1]
+      if base:
+        if numpy_for(stop - start):
+          column = array('i', (self.as_numpy(offsets)[start:stop + 1] - base).tobytes())
+        else:
+          column = array('i', (offset - base for offset in column))
+      setattr(t, offsets, column)
+      for name in values:
+        setattr(t, name, memoryview(getattr(self, name))[base:end])
+    for name in self.STRINGS:
+      column = getattr(self, name)
+      if isinstance(column, StringColumn):
+        setattr(t, name, column.view(start, stop))
+      else:
+        setattr(t, name, column[start:stop])
+    return t
+
+  def sort_published(self):
+    '''Return the Table sorted by published time, newest first, ties in order'''
+
+    published = self.published
+    if all(published[i] >= published[i + 1] for i in range(len(published) - 1)):
+      return self
+    return self.take(sorted(range(len(self)), key=published.__getitem__, reverse=True))
+
+  def published_between(self, d1=None, d2=None):
+    '''Return the start and stop rows of entries published between d1 and d2
+    inclusively
+
+    d1 and d2 are microseconds since the epoch, None for no limit.'''
+
+    published = self.published
+    start = 0 if d2 is None else bisect_descending(published, d2 + 1)
+    stop = len(published) if d1 is None else bisect_descending(published, d1, start)
+    return start, stop
+
+  def published_at(self, i):
+
+    return from_epoch(self.published[i], self.published_tz[i])
+
+  def iter_published(self):
+
+    return map(from_epoch, self.published, self.published_tz)
+
+  def updated_at(self, i):
+
+    return from_epoch(self.updated[i], self.updated_tz[i])
+
+  def updated_key(self, i):
+
+    return self.updated[i], self.updated_tz[i]
+
+  def updated_after_total(self):
+    '''Return the number of entries updated after published and the total of
+    microseconds between the times'''
+
+    if numpy_for(len(self)):
+      updated = self.as_numpy('updated')
+      after = updated - updated % 1000000 - self.as_numpy('published')
+      after = after[after != 0]
+      return len(after), int(after.sum())
+    after = [u - u % 1000000 - p for u, p in zip(self.updated, self.published)]
+    after = [a for a in after if a]
+    return len(after), sum(after)
+
+  def updated_after(self, i):
+    '''Return the timedelta between published and updated of entry i
+
+    published doesn't have microseconds, but updated has, so the microseconds
+    are dropped.'''
+
+    updated = self.updated[i]
+    updated -= updated % 1000000
+    return datetime.timedelta(microseconds=updated - self.published[i])
+
+  def author_name(self, i):
+
+    return self.authors[self.author[i]]
+
+  def ref(self, i):
+    '''Return the ID of the post which entry i replies to, or None'''
+
+    ref = self.reply_to[i]
+    return self.refs[ref] if ref >= 0 else None
+
+  def labels_ids_of(self, i):
+
+    i %= len(self)
+    return self.label_ids[self.label_offsets[i]:self.label_offsets[i + 1]]
+
+  def labels_of(self, i):
+
+    return [self.labels[l] for l in self.labels_ids_of(i)]
+
+  def iter_labels(self):
+    '''Return an iterator of labels of all entries'''
+
+    return (self.labels[l] for l in self.label_ids)
+
+  def entry(self, i):
+    '''Return entry i as a dict'''
+
+    e = {
+      'id': self.id[i],
+      'published': self.published_at(i),
+      'updated': self.updated_at(i),
+      'updated_after': self.updated_after(i),
+      'title': self.title[i],
+      'author': {'name': self.author_name(i)},
+      'text': self.text[i],
+      'words': self.words[i],
+      'chars': self.chars[i],
+    }
+    if self.reply_to[i] >= 0:
+      e['in-reply-to'] = {'ref': self.ref(i)}
+    labels = self.labels_of(i)
+    if labels:
+      e['label'] = labels
+    return e
+
+
+class Feed(dict):
+  '''Feed with entries of KINDS in Tables, other entries in lists of dicts'''
+
+  KINDS = ('post', 'comment', 'page', 'draft')
+  STRINGS = ('authors', 'labels', 'refs', 'terms')
+
+  def __init__(self):
+
+    super().__init__()
+    self.source = None
+    self.capacity = None
+    self.window = (None, None)
+    self.all_comments = None
+    self.profile = NO_PROFILE
+    for name in self.STRINGS:
+      setattr(self, name, Strings())
+    for kind in self.KINDS:
+      self[kind] = Table(self)
+
+  def __missing__(self, key):
+
+    if key != 'comment' or self.all_comments is None:
+      raise KeyError(key)
+    comments = self.all_comments
+    with self.profile.phase('filter comments'):
+      rows = self.cube.replied(comments, *self.window)
+      if len(rows) != len(comments):
+        comments = comments.take(rows)
+    self['comment'] = comments
+    return comments
+
+  def select(self, d1=None, d2=None):
+    '''Return a new Feed of entries published between d1 and d2
+
+    d1 and d2 are microseconds since the epoch, None for no limit.  Comments
+    which don't have post to belong to are removed when the comments are first
+    accessed, all_comments keeps the comments published between d1 and d2.'''
+
+    f = Feed()
+    f.update(self)
+    f.source = self.source
+    f.capacity = self.capacity
+    f.profile = self.profile
+    f.cube = self.cube
+    for name in self.STRINGS:
+      setattr(f, name, getattr(self, name))
+    if d1 is not None or d2 is not None:
+      for kind in ('post', 'page', 'comment'):
+        f[kind] = self[kind].slice(*self[kind].published_between(d1, d2))
+    f.window = (d1, d2)
+    f.all_comments = f.pop('comment')
+    return f
+
+  @memoized
+  def cube(self):
+
+    return Cube(self)
+
+  @memoized
+  def aggregates(self):
+    '''Dict of each of Cube.KINDS to its aggregates, see Cube.aggregate'''
+
+    return dict((kind, self.cube.aggregate(self, kind)) for kind in Cube.KINDS)
+
+  @memoized
+  def index(self):
+
+    return Index(self)
+
+  @memoized
+  def histograms(self):
+    '''Histograms of published time of posts and comments
+
+    The histograms are a dict of each of TIME_KEYS to a dict of formatted time
+    to a tuple of numbers of posts and comments.'''
+
+    return time_histograms(self.aggregates['post']['hours'],
+                           self.aggregates['comment']['hours'])
+
+  @memoized
+  def label_counts(self):
+    '''Dict of label to the number of posts labeled'''
+
+    return dict((self.labels[label], count)
+                for label, count in self.aggregates['post']['labels'].items())
+
+  @memoized
+  def label_relations(self):
+    '''Co-occurrences and monthly histograms of labels of posts by names, see
+    label_relations'''
+
+    posts = self['post']
+    pairs, months = label_relations(zip(posts.published, posts.published_tz,
+                                        map(posts.labels_ids_of, range(len(posts)))))
+    labels = list(self.labels)
+    return (Counter(dict((tuple(sorted((labels[a], labels[b]))), count)
+                         for (a, b), count in pairs.items())),
+            dict((labels[label], counts) for label, counts in months.items()))
+
+  @memoized
+  def word_counts(self):
+    '''Dict of term ID to the number of its occurrences in posts
+
+    The terms are in the order of their first occurrences.'''
+
+    posts = self['post']
+    if numpy_for(len(posts.term_ids)):
+      ids = posts.as_numpy('term_ids')
+      if not len(ids):
+        return {}
+      counts = numpy.bincount(ids, posts.as_numpy('term_counts'))
+      ids, first = numpy.unique(ids, return_index=True)
+      ids = ids[numpy.argsort(first)]
+      return dict(zip(ids.tolist(), counts[ids].astype(numpy.int64).tolist()))
+    counts = Counter()
+    for term, count in zip(posts.term_ids, posts.term_counts):
+      counts[term] += count
+    return counts
+
+  @memoized
+  def commenter_counts(self):
+    '''Dict of commenter to the number of comments on posts'''
+
+    comments = self['comment']
+    rows = chain.from_iterable(self.index.comments_by_post.values())
+    return dict((k, sum(1 for _ in g))
+                for k, g in groupby(sorted(map(comments.author_name, rows))))
+
+  @memoized
+  def commented_posts(self):
+    '''List of (ID, row, number of comments) of commented posts by ID'''
+
+    posts = self['post']
+    return sorted((posts.id[post], post, len(comments))
+                  for post, comments in self.index.comments_by_post.items())
+
+  @memoized
+  def commenter_summary(self):
+    '''SpaceSaving of author IDs of comments'''
+
+    return SpaceSaving(self.capacity, self['comment'].author)
+
+  @memoized
+  def commented_summary(self):
+    '''SpaceSaving of IDs of refs which comments reply to'''
+
+    return SpaceSaving(self.capacity, self['comment'].reply_to)
+
+  @memoized
+  def label_summary(self):
+    '''SpaceSaving of label IDs of posts'''
+
+    return SpaceSaving(self.capacity, self['post'].label_ids)
+
+  @memoized
+  def word_summary(self):
+    '''SpaceSaving of term IDs of posts weighted by their occurrences'''
+
+    posts = self['post']
+    return SpaceSaving(self.capacity, posts.term_ids, posts.term_counts)
+
+  def as_dict(self):
+    '''Return the feed with entries of Tables converted to dicts'''
+
+    d = dict(self)
+    for kind in self.KINDS:
+      d[kind] = [self[kind].entry(i) for i in range(len(self[kind]))]
+    return d
+
+
+class Index(object):
+  '''Index of posts and comments of a Feed
+
+  post_by_id maps post ID to row of post, comments_by_post maps row of post to
+  rows of comments which reply to the post, and posts_by_label maps label ID to
+  rows of posts.  Each is built when it's first accessed.'''
+
+  def __init__(self, f):
+
+    self.f = f
+
+  @memoized
+  def post_by_id(self):
+
+    return dict((_id, i) for i, _id in enumerate(self.f['post'].id))
+
+  @memoized
+  def comments_by_post(self):
+
+    post_by_id = self.post_by_id
+    ref_to_post = dict((i, post_by_id.get(ref)) for i, ref in enumerate(self.f.refs))
+    comments_by_post = {}
+    for i, ref in enumerate(self.f['comment'].reply_to):
+      post = ref_to_post.get(ref)
+      if post is not None:
+        list_it(comments_by_post, post, i)
+    return comments_by_post
+
+  @memoized
+  def posts_by_label(self):
+
+    posts = self.f['post']
+    posts_by_label = {}
+    offsets = posts.label_offsets
+    for i in range(len(posts)):
+      for label in posts.label_ids[offsets[i]:offsets[i + 1]]:
+        list_it(posts_by_label, label, i)
+    return posts_by_label
+
+
+class SpaceSaving(object):
+  '''Approximate counts of the most frequent items of a stream
+
+  At most capacity items are counted.  When the counters are full, the item
+  with the least count is replaced by the new item, which takes over the count
+  as its error.  A count exceeds the true count by no more than its error, and
+  every item occurring more than total / capacity times is counted.'''
+
+  def __init__(self, capacity, items=(), weights=None):
+
+    self.capacity = capacity
+    self.total = 0
+    self.counts = {}
+    self.heap = []
+    # the most an item not counted may occur while not full, after merges
+    self.floor = 0
+    if weights is None:
+      for item in items:
+        self.add(item)
+    else:
+      for item, weight in zip(items, weights):
+        self.add(item, weight)
+
+  def __len__(self):
+
+    return len(self.counts)
+
+  def add(self, item, weight=1, error=0):
+
+    self.total += weight
+    counts = self.counts
+    counter = counts.get(item)
+    if counter is not None:
+      counter[0] += weight
+      counter[1] += error
+      return
+    if len(counts) < self.capacity:
+      counts[item] = [weight + self.floor, error + self.floor]
+      heapq.heappush(self.heap, (weight + self.floor, item))
+      return
+
+    # counts in the heap are only updated when they reach the top
+    heap = self.heap
+    while True:
+      count, least = heap[0]
+      current = counts[least][0]
+      if current == count:
+        break
+      heapq.heapreplace(heap, (current, least))
+    del counts[least]
+    counts[item] = [count + weight, count + error]
+    heapq.heapreplace(heap, (count + weight, item))
+
+  def update(self, other, key=None):
+    '''Merge the counts of other SpaceSaving, whose items are mapped by key
+
+    An item missing from either summary may have occurred there as many times
+    as its least count if it's full, which is added to the item's count and
+    error, then the capacity most counted items are kept, so a count exceeds
+    the true count by no more than its error.'''
+
+    counts = {}
+    for item, (count, error) in other.counts.items():
+      if key is not None:
+        item = key(item)
+      counter = counts.setdefault(item, [0, 0])
+      counter[0] += count
+      counter[1] += error
+    least, other_least = self.error, other.error
+    for item, counter in self.counts.items():
+      count, error = counts.get(item, (other_least, other_least))
+      counts[item] = [counter[0] + count, counter[1] + error]
+    for item, counter in counts.items():
+      if item not in self.counts:
+        counter[0] += least
+        counter[1] += least
+    if len(counts) > self.capacity:
+      counts = dict(heapq.nlargest(self.capacity, counts.items(),
+                                   key=lambda item: item[1][0]))
+    self.counts = counts
+    self.heap = [(count, item) for item, (count, _) in counts.items()]
+    heapq.heapify(self.heap)
+    self.floor = least + other_least
+    self.total += other.total
+
+  @property
+  def error(self):
+    '''The most an item can be overcounted, or undercounted if not counted'''
+
+    if len(self.counts) < self.capacity:
+      return self.floor
+    return min(count for count, error in self.counts.values())
+
+  def top(self, n):
+    '''Return a list of (count, item, error) of the n most counted items'''
+
+    return heapq.nlargest(n, ((count, item, error) for item, (count, error)
+                              in self.counts.items()))
+
+
+TIME_KEYS = ('%Y-%m', '%Y', '%m', '%d', '%H', '%w-%H')
+
+
+def label_relations(posts):
+  '''Return the co-occurrences and the monthly histograms of labels of posts
+
+  posts is an iterable of (published, published_tz, labels).  The
+  co-occurrences are a Counter of sorted pairs of labels of the same posts, and
+  the histograms map label to a Counter of YYYY-MM to the number of posts.'''
+
+  pairs = []
+  label_months = []
+  month_of_day = {}
+  epoch = datetime.date(1970, 1, 1)
+  for published, tz, labels in posts:
+    if not labels:
+      continue
+    day = (published // 1000000 + tz) // 86400
+    month = month_of_day.get(day)
+    if month is None:
+      d = epoch + datetime.timedelta(days=day)
+      month = month_of_day[day] = '%d-%02d' % (d.year, d.month)
+    labels = sorted(set(labels))
+    label_months.extend(zip(labels, repeat(month)))
+    pairs.extend(combinations(labels, 2))
+
+  months = {}
+  for (label, month), count in Counter(label_months).items():
+    counts = months.get(label)
+    if counts is None:
+      counts = months[label] = Counter()
+    counts[month] = count
+  pairs = Counter(pairs)
+  return pairs, months
+
+
+def time_histograms(*hours):
+  '''Return histograms by TIME_KEYS from Counters of local hours
+
+  Every key of the histograms maps to a tuple of counts from each Counter.
+  Counts are summed by day and by hour of week first, so each day is only
+  formatted once.'''
+
+  n = len(hours)
+  by_day = {}
+  by_hour = {}
+  for i, counter in enumerate(hours):
+    for hour, count in counter.items():
+      day, h = divmod(hour, 24)
+      by_day.setdefault(day, [0] * n)[i] += count
+      # 1970-01-01 is a Thursday, %w is 0 for Sunday
+      by_hour.setdefault(((day + 4) % 7, h), [0] * n)[i] += count
+
+  histograms = dict((key, {}) for key in TIME_KEYS)
+
+  def add(key, k, counts):
+
+    histogram = histograms[key]
+    if k in histogram:
+      histogram[k] = tuple(map(sum, zip(histogram[k], counts)))
+    else:
+      histogram[k] = tuple(counts)
+
+  epoch = datetime.date(1970, 1, 1)
+  for day, counts in by_day.items():
+    d = epoch + datetime.timedelta(days=day)
+    add('%Y-%m', '%d-%02d' % (d.year, d.month), counts)
+    add('%Y', str(d.year), counts)
+    add('%m', '%02d' % d.month, counts)
+    add('%d', '%02d' % d.day, counts)
+  for (weekday, h), counts in by_hour.items():
+    add('%H', '%02d' % h, counts)
+    add('%w-%H', '%d-%02d' % (weekday, h), counts)
+  return histograms
+
+
+HOUR = 3600 * 1000000
+MISSING = -2 ** 63
+
+
+def hour_cell(published, tz):
+  '''Return the local hour since the epoch of published time in UTC offset tz
+  and the start of the hour in microseconds since the epoch'''
+
+  hour = (published // 1000000 + tz) // 3600
+  return hour, (hour * 3600 - tz) * 1000000
+
+
+class Cube(object):
+  '''Counts and sums of posts and comments by hour cells
+
+  A cell is a local hour in an UTC offset.  cells maps each of KINDS to columns
+  of cells sorted by start: start of the hour in microseconds since the epoch,
+  the local hour since the epoch, the number of entries, the sums of words and
+  chars, and the numbers of labels, where the label IDs and counts of cell i
+  are label_ids and label_counts[label_offsets[i]:label_offsets[i + 1]].
+
+  ref_published maps ref ID to the published time of the post, MISSING if the
+  ref isn't a post, with an extra MISSING for entries replying to nothing.
+  '''
+
+  KINDS = ('post', 'comment')
+  COLUMNS = (
+    ('start', 'q'),
+    ('hour', 'i'),
+    ('count', 'i'),
+    ('words', 'q'),
+    ('chars', 'q'),
+    ('label_offsets', 'i'),
+    ('label_ids', 'i'),
+    ('label_counts', 'i'),
+  )
+
+  def __init__(self, f=None):
+    '''Create the Cube of Feed f, or an empty Cube without f'''
+
+    self.cells = dict((kind, dict((name, array(typecode)) for name, typecode in self.COLUMNS))
+                      for kind in self.KINDS)
+    self.ref_published = array('q')
+    if f is None:
+      return
+
+    for kind in self.KINDS:
+      table = f[kind]
+      rows_by_cell = {}
+      for i, (published, tz) in enumerate(zip(table.published, table.published_tz)):
+        hour, start = hour_cell(published, tz)
+        list_it(rows_by_cell, (start, hour), i)
+      cells = self.cells[kind]
+      cells['label_offsets'].append(0)
+      for (start, hour), rows in sorted(rows_by_cell.items()):
+        cells['start'].append(start)
+        cells['hour'].append(hour)
+        cells['count'].append(len(rows))
+        cells['words'].append(sum(table.words[i] for i in rows))
+        cells['chars'].append(sum(table.chars[i] for i in rows))
+        labels = Counter(chain.from_iterable(map(table.labels_ids_of, rows)))
+        for label in sorted(labels):
+          cells['label_ids'].append(label)
+          cells['label_counts'].append(labels[label])
+        cells['label_offsets'].append(len(cells['label_ids']))
+
+    posts = f['post']
+    published = dict(zip(posts.id, posts.published))
+    self.ref_published.extend(published.get(ref, MISSING) for ref in f.refs)
+    self.ref_published.append(MISSING)
+
+  def columns(self):
+    '''Return a list of (kind, name, typecode) of columns of cells'''
+
+    return [(kind, name, typecode) for kind in self.KINDS for name, typecode in self.COLUMNS]
+
+  def replying(self, comments, d1=None, d2=None):
+    '''Return whether each of comments replies to a post published between d1
+    and d2, a NumPy array for many comments'''
+
+    ref_published = self.ref_published
+    if numpy_for(len(comments)):
+      published = numpy.frombuffer(ref_published, numpy.int64)[comments.as_numpy('reply_to')]
+      mask = published != MISSING
+      if d1 is not None:
+        mask &= published >= d1
+      if d2 is not None:
+        mask &= published <= d2
+      return mask
+    return [ref_published[ref] != MISSING and
+            (d1 is None or ref_published[ref] >= d1) and
+            (d2 is None or ref_published[ref] <= d2)
+            for ref in comments.reply_to]
+
+  def replied(self, comments, d1=None, d2=None, replying=True):
+    '''Return rows of comments replying, or not replying, to posts published
+    between d1 and d2'''
+
+    mask = self.replying(comments, d1, d2)
+    if not isinstance(mask, list):
+      return numpy.flatnonzero(mask if replying else ~mask)
+    return [i for i, r in enumerate(mask) if r == replying]
+
+  def aggregate(self, f, kind):
+    '''Return a dict of the aggregates of entries of kind in the window of Feed f
+
+    The dict has hours and labels, Counters of local hours and label IDs, and
+    count, words, and chars.  Cells entirely in the window are summed, entries
+    in the other cells are added one by one.  Comments which don't reply to
+    posts in the window are excluded.'''
+
+    d1, d2 = f.window
+    table = f['post'] if kind == 'post' else f.all_comments
+    if table is None:
+      table = f['comment']
+    cells = self.cells[kind]
+    start = 0 if d1 is None else bisect.bisect_left(cells['start'], d1)
+    stop = len(cells['start'])
+    if d2 is not None:
+      stop = max(start, bisect.bisect_right(cells['start'], d2 - HOUR + 1))
+
+    hours = Counter()
+    for hour, count in zip(cells['hour'][start:stop], cells['count'][start:stop]):
+      hours[hour] += count
+    labels = Counter()
+    offsets = cells['label_offsets']
+    for label, count in zip(cells['label_ids'][offsets[start]:offsets[stop]],
+                            cells['label_counts'][offsets[start]:offsets[stop]]):
+      labels[label] += count
+    d = dict(hours=hours, labels=labels,
+             count=sum(cells['count'][start:stop]),
+             words=sum(cells['words'][start:stop]),
+             chars=sum(cells['chars'][start:stop]))
+
+    # entries within an hour from the ends of the window, in cells not summed
+    published = table.published
+    rows = set()
+    if d2 is not None:
+      rows.update(range(bisect_descending(published, d2 - HOUR + 1)))
+    if d1 is not None:
+      rows.update(range(bisect_descending(published, d1 + HOUR), len(table)))
+    for i in rows:
+      hour, cell = hour_cell(published[i], table.published_tz[i])
+      if (d1 is None or cell >= d1) and (d2 is None or cell <= d2 - HOUR + 1):
+        continue
+      hours[hour] += 1
+      labels.update(table.labels_ids_of(i))
+      d['count'] += 1
+      d['words'] += table.words[i]
+      d['chars'] += table.chars[i]
+
+    if kind == 'comment':
+      for i in self.replied(table, d1, d2, False):
+        hour, _ = hour_cell(table.published[i], table.published_tz[i])
+        hours[hour] -= 1
+        d['count'] -= 1
+        d['words'] -= table.words[i]
+        d['chars'] -= table.chars[i]
+    d['hours'] = +hours
+    return d
+
+
+class Network(object):
+  '''Aggregates of Feeds of many blogs
+
+  blogs is a list of (title, number of posts, number of comments) of blogs,
+  histograms are the sums of the Feeds' histograms, and commenter_counts and
+  commenter_blogs map commenter to the numbers of comments and blogs.  With
+  capacity, they are SpaceSaving of commenters counted by the Feeds' summaries.'''
+
+  def __init__(self, capacity=None):
+
+    self.capacity = capacity
+    self.blogs = []
+    self.histograms = dict((key, {}) for key in TIME_KEYS)
+    if capacity:
+      self.commenter_counts = SpaceSaving(capacity)
+      self.commenter_blogs = SpaceSaving(capacity)
+    else:
+      self.commenter_counts = Counter()
+      self.commenter_blogs = Counter()
+
+  def add(self, f):
+
+    self.blogs.append((f['title'], len(f['post']), f.aggregates['comment']['count']))
+    self.add_histograms(f.histograms)
+    if self.capacity:
+      summary = f.commenter_summary
+      self.commenter_counts.update(summary, f.authors.__getitem__)
+      for author in summary.counts:
+        self.commenter_blogs.add(f.authors[author])
+      return
+    self.commenter_counts.update(f.commenter_counts)
+    self.commenter_blogs.update(f.commenter_counts.keys())
+
+  def add_histograms(self, histograms):
+
+    for key, histogram in histograms.items():
+      merged = self.histograms[key]
+      for k, counts in histogram.items():
+        merged[k] = tuple(map(sum, zip(merged.get(k, (0, 0)), counts)))
+
+  def update(self, n):
+    '''Add the aggregates of another Network'''
+
+    self.blogs.extend(n.blogs)
+    self.add_histograms(n.histograms)
+    self.commenter_counts.update(n.commenter_counts)
+    self.commenter_blogs.update(n.commenter_blogs)
+
+
+# =====
+# Cache
+# =====
+
+
+class HashReader(object):
+  '''File wrapper which hashes the content as it is read'''
+
+  def __init__(self, f):
+
+    import hashlib
+
+    self.f = f
+    self.hash = hashlib.sha256()
+
+  def read(self, size=-1):
+
+    data = self.f.read(size)
+    self.hash.update(data)
+    return data
+
+  def hexdigest(self):
+    '''Return the hash of the whole file, reading the rest of it'''
+
+    if self.hash is None:
+      return hash_file(self.f.name)
+    for _ in iter(lambda: self.read(1 << 20), b''):
+      pass
+    return self.hash.hexdigest()
+
+  def close(self):
+
+    self.f.close()
+
+
+MAGICS = (
+  (b'\x1f\x8b', 'gzip'),
+  (b'BZh', 'bz2'),
+  (b'\xfd7zXZ\x00', 'xz'),
+  (b'PK\x03\x04', 'zip'),
+)
+XML_SUFFIXES = ('.xml', '.xml.gz', '.xml.bz2', '.xml.xz', '.xml.zip')
+
+
+def decompress(source):
+  '''Return the file of XML content of HashReader source
+
+  Files compressed by gzip, bzip2, xz, or zip are detected by the magic bytes
+  and decompressed as they are read.  A zip file must have one XML file or
+  only one file, as it's read out of order, its hash is set to None.'''
+
+  magic = source.f.peek(8)
+  fmt = next((fmt for m, fmt in MAGICS if magic.startswith(m)), None)
+  if fmt == 'gzip':
+    import gzip
+    return gzip.GzipFile(fileobj=source)
+  if fmt == 'bz2':
+    import bz2
+    return bz2.BZ2File(source)
+  if fmt == 'xz':
+    import lzma
+    return lzma.LZMAFile(source)
+  if fmt == 'zip':
+    import zipfile
+    source.hash = None
+    z = zipfile.ZipFile(source.f)
+    names = [name for name in z.namelist() if name.endswith('.xml')]
+    names = names or z.namelist()
+    if len(names) != 1:
+      raise ValueError('%s: zip file must have one XML file' % source.f.name)
+    return z.open(names[0])
+  return source
+
+
+def stat_source(filename):
+
+  st = os.stat(filename)
+  return st.st_size, st.st_mtime_ns
+
+
+def hash_file(filename):
+
+  import hashlib
+
+  h = hashlib.sha256()
+  with open(filename, 'rb') as f:
+    for data in iter(lambda: f.read(1 << 20), b''):
+      h.update(data)
+  return h.hexdigest()
+
+
+class StringColumn(Sequence):
+  '''Strings in UTF-8 of a buffer, which are decoded when accessed
+
+  String i is buf[ends[i]:ends[i + 1]].  A single string is decoded on its own,
+  iterating or searching decodes all strings once.'''
+
+  def __init__(self, ends, buf):
+
+    self.ends = ends
+    self.buf = buf
+    self.strings = None
+
+  def __len__(self):
+
+    return len(self.ends) - 1
+
+  def __getitem__(self, i):
+
+    if self.strings is not None or isinstance(i, slice):
+      return self.load()[i]
+    if i < 0:
+      i += len(self)
+    if not 0 <= i < len(self):
+      raise IndexError('string index out of range')
+    return str(self.buf[self.ends[i]:self.ends[i + 1]], 'utf-8')
+
+  def __iter__(self):
+
+    return iter(self.load())
+
+  def __contains__(self, s):
+
+    return s in self.load()
+
+  def index(self, s):
+
+    return self.load().index(s)
+
+  def view(self, start, stop):
+    '''Return a StringColumn of strings from start to stop without copying'''
+
+    column = StringColumn(self.ends[start:stop + 1], self.buf)
+    if self.strings is not None:
+      column.strings = self.strings[start:stop]
+    return column
+
+  def load(self):
+
+    if self.strings is None:
+      ends = self.ends.tolist()
+      base = ends[0]
+      buf = self.buf[base:ends[-1]].tobytes()
+      self.strings = [str(buf[i - base:j - base], 'utf-8') for i, j in zip(ends, ends[1:])]
+    return self.strings
+
+
+def save_cache(filename_cache, f):
+  '''Save Feed f into cache file
+
+  The cache file starts with CACHE_MAGIC and the offset of the header, which is
+  a pickled dict at the end of file.  Numbers and strings are stored in 8-byte
+  aligned blocks before the header, the locations are in the header.
+  '''
+
+  blocks = {}
+  filename_tmp = filename_cache + '.tmp'
+  with open(filename_tmp, 'wb') as out:
+
+    def put(key, data, typecode='B'):
+
+      out.write(b'\0' * (-out.tell() % 8))
+      offset = out.tell()
+      out.write(data)
+      blocks[key] = (offset, out.tell() - offset, typecode)
+
+    def put_strings(key, strings):
+
+      ends = array('q', [0])
+      data = []
+      for s in strings:
+        data.append(s.encode('utf-8'))
+        ends.append(ends[-1] + len(data[-1]))
+      put(key + ('ends',), ends, 'q')
+      put(key + ('buf',), b''.join(data))
+
+    out.write(CACHE_MAGIC + bytes(12))
+    for name in Feed.STRINGS:
+      put_strings((name,), getattr(f, name))
+    for kind in Feed.KINDS:
+      table = f[kind]
+      for name, typecode in table.columns():
+        if typecode:
+          put((kind, name), getattr(table, name), typecode)
+        else:
+          put_strings((kind, name), getattr(table, name))
+    cube = f.cube
+    for kind, name, typecode in cube.columns():
+      put(('cube', kind, name), cube.cells[kind][name], typecode)
+    put(('cube', 'ref_published'), cube.ref_published, 'q')
+    header = {
+      'version': CACHE_VERSION,
+      'byteorder': sys.byteorder,
+      'source': f.source,
+      'feed': dict((k, v) for k, v in f.items() if k not in Feed.KINDS),
+      'blocks': blocks,
+    }
+    offset = out.tell()
+    pickle.dump(header, out, pickle.HIGHEST_PROTOCOL)
+    out.seek(len(CACHE_MAGIC))
+    out.write(struct.pack('=Q', offset))
+  os.replace(filename_tmp, filename_cache)
+
+
+def load_cache(filename_cache, filename=None):
+  '''Return the Feed in cache file if it is valid for XML file, or None
+
+  The cache is valid if the size and the modification time of XML file are
+  same as those when the cache was saved.  If only the time differs, the
+  content hashes are compared, and the new time is saved when they match and
+  the cache file is writable.  Without XML file, the cache isn't validated.
+
+  Numbers are memory-mapped, strings are decoded when accessed.'''
+
+  try:
+    with open(filename_cache, 'rb') as cache:
+      mm = mmap.mmap(cache.fileno(), 0, access=mmap.ACCESS_READ)
+  except (OSError, ValueError):
+    return None
+  if mm[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+    return None
+  try:
+    offset, = struct.unpack_from('=Q', mm, len(CACHE_MAGIC))
+    header = pickle.loads(mm[offset:])
+  except Exception:
+    return None
+  valid = (header.get('version') == CACHE_VERSION and
+           header.get('byteorder') == sys.byteorder)
+  if not valid:
+    return None
+
+  size, mtime, digest = header['source']
+  source = stat_source(filename) if filename else header['source'][:2]
+  if source[0] != size:
+    return None
+  if source[1] != mtime:
+    if hash_file(filename) != digest:
+      return None
+    header['source'] = source + (digest,)
+    # the cache is still valid if the new time can't be saved
+    try:
+      with open(filename_cache, 'r+b') as cache:
+        cache.seek(offset)
+        pickle.dump(header, cache, pickle.HIGHEST_PROTOCOL)
+        cache.truncate()
+    except OSError:
+      pass
+
+  buf = memoryview(mm)
+  blocks = header['blocks']
+
+  def get(key):
+
+    offset, size, typecode = blocks[key]
+    return buf[offset:offset + size].cast(typecode)
+
+  def get_strings(key):
+
+    return StringColumn(get(key + ('ends',)), get(key + ('buf',)))
+
+  f = Feed()
+  f.update(header['feed'])
+  f.source = header['source']
+  for name in Feed.STRINGS:
+    setattr(f, name, get_strings((name,)))
+  for kind in Feed.KINDS:
+    table = f[kind] = Table(f)
+    for name, typecode in table.columns():
+      if typecode:
+        setattr(table, name, get((kind, name)))
+      else:
+        setattr(table, name, get_strings((kind, name)))
+  f.cube = Cube()
+  for kind, name, typecode in f.cube.columns():
+    f.cube.cells[kind][name] = get(('cube', kind, name))
+  f.cube.ref_published = get(('cube', 'ref_published'))
+  return f
+
+
+# ======
+# SQLite
+# ======
+
+
+DATABASE_VERSION = 2
+DATABASE_SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value BLOB);
+CREATE TABLE entries (
+  kind TEXT, row INTEGER, id TEXT, published INTEGER, published_tz INTEGER,
+  updated INTEGER, updated_tz INTEGER, words INTEGER, chars INTEGER,
+  author TEXT, reply_to TEXT, title TEXT, PRIMARY KEY (kind, row));
+CREATE TABLE labels (kind TEXT, row INTEGER, label TEXT);
+CREATE TABLE terms (id INTEGER PRIMARY KEY, term TEXT);
+CREATE TABLE post_terms (row INTEGER, term INTEGER, count INTEGER, seq INTEGER);
+CREATE TEMP TABLE ranks (rank INTEGER PRIMARY KEY, old INTEGER UNIQUE);
+'''
+DATABASE_INDEXES = '''
+CREATE INDEX entries_published ON entries (kind, published);
+CREATE INDEX entries_id ON entries (kind, id);
+CREATE INDEX entries_author ON entries (kind, author);
+CREATE INDEX labels_row ON labels (kind, row);
+CREATE INDEX labels_label ON labels (label);
+CREATE INDEX post_terms_row ON post_terms (row);
+ANALYZE;
+'''
+MIN_US, MAX_US = -2 ** 63, 2 ** 63 - 1
+# SQLite divides integers toward zero, as floor for times after the epoch
+LOCAL_HOUR = '({0}.published / 1000000 + {0}.published_tz) / 3600'
+
+
+def insert_entries(db, kind, table, start=0):
+  '''Insert entries of Table of kind into database db as rows from start'''
+
+  db.executemany(
+    'INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    ((kind, start + i, table.id[i], table.published[i], table.published_tz[i],
+      table.updated[i], table.updated_tz[i], table.words[i], table.chars[i],
+      table.author_name(i), table.ref(i), table.title[i])
+     for i in range(len(table))))
+  db.executemany('INSERT INTO labels VALUES (?, ?, ?)',
+                 ((kind, start + i, label) for i in range(len(table))
+                  for label in table.labels_of(i)))
+  if kind == 'post':
+    offsets = table.term_offsets
+    db.executemany('INSERT INTO post_terms VALUES (?, ?, ?, ?)',
+                   ((start + i, table.term_ids[j], table.term_counts[j], j - offsets[i])
+                    for i in range(len(table))
+                    for j in range(offsets[i], offsets[i + 1])))
+
+
+def sort_database(db, kind):
+  '''Renumber rows of kind in database db by published time, newest first,
+  ties in order, as Table.sort_published'''
+
+  db.execute('DELETE FROM ranks')
+  db.execute('INSERT INTO ranks (old) SELECT row FROM entries WHERE kind = ? '
+             'ORDER BY published DESC, row', (kind, ))
+  # through negative rows, so no two entries have the same row in between
+  db.execute('UPDATE entries SET row = -(SELECT rank FROM ranks WHERE old = entries.row) '
+             'WHERE kind = ?', (kind, ))
+  db.execute('UPDATE entries SET row = -row - 1 WHERE kind = ?', (kind, ))
+  db.execute('UPDATE labels SET row = (SELECT rank - 1 FROM ranks WHERE old = labels.row) '
+             'WHERE kind = ?', (kind, ))
+  if kind == 'post':
+    db.execute('UPDATE post_terms SET row = (SELECT rank - 1 FROM ranks '
+               'WHERE old = post_terms.row)')
+
+
+def save_database(filename_db, filename, jobs=1, base=None, profile=None):
+  '''Parse the exported XML file into SQLite database file
+
+  Entries of Tables are rows of entries by kind and row, labels and terms of
+  posts are in their own tables, and the rest of the feed is pickled in meta.
+  Each batch of entries is inserted as soon as it's loaded, see load_feed, so
+  only the interned strings are kept in memory, then the rows are sorted.
+  seq of a term is its position in the terms of the post.'''
+
+  import sqlite3
+
+  filename_tmp = filename_db + '.tmp'
+  if os.path.exists(filename_tmp):
+    os.remove(filename_tmp)
+  db = sqlite3.connect(filename_tmp)
+  db.executescript(DATABASE_SCHEMA)
+  rows = dict((kind, 0) for kind in Feed.KINDS)
+
+  def added(f):
+
+    for kind in Feed.KINDS:
+      insert_entries(db, kind, f[kind], rows[kind])
+      rows[kind] += len(f[kind])
+      f[kind] = Table(f)
+
+  f = load_feed(filename, jobs, base, profile, added)
+  for kind in Feed.KINDS:
+    sort_database(db, kind)
+  db.executemany('INSERT INTO terms VALUES (?, ?)', enumerate(f.terms))
+  meta = (('version', DATABASE_VERSION), ('source', pickle.dumps(f.source)),
+          ('feed', pickle.dumps(dict((k, v) for k, v in f.items() if k not in Feed.KINDS))))
+  db.executemany('INSERT INTO meta VALUES (?, ?)', meta)
+  db.executescript(DATABASE_INDEXES)
+  db.commit()
+  db.close()
+  os.replace(filename_tmp, filename_db)
+
+
+def load_database(filename_db, filename=None):
+  '''Return the SQLFeed of database file if it is valid for XML file, or None
+
+  The database is valid as the cache file is, by the size and the modification
+  time, or the content hash of XML file.'''
+
+  import sqlite3
+  from urllib.request import pathname2url
+
+  if not os.path.exists(filename_db):
+    return None
+  try:
+    uri = 'file:%s?mode=ro' % pathname2url(os.path.abspath(filename_db))
+    db = sqlite3.connect(uri, uri=True)
+    meta = dict(db.execute('SELECT key, value FROM meta'))
+  except sqlite3.Error:
+    return None
+  if meta.get('version') != DATABASE_VERSION:
+    return None
+  source = pickle.loads(meta['source'])
+  if filename and stat_source(filename) != source[:2]:
+    if hash_file(filename) != source[2]:
+      return None
+
+  f = SQLFeed(db)
+  f.update(pickle.loads(meta['feed']))
+  f.source = source
+  return f
+
+
+class SQLColumn(Sequence):
+  '''Column name of a SQLTable, whose values are queried when accessed'''
+
+  def __init__(self, table, name):
+
+    self.table = table
+    self.name = name
+
+  def __len__(self):
+
+    return len(self.table)
+
+  def __getitem__(self, i):
+
+    return self.table.value(self.name, i)
+
+
+class SQLTable(object):
+  '''Entries of kind from row start to row stop in database db
+
+  Only what sections use of Tables is provided, a value is queried when it's
+  accessed.  The length is size if given, as comments are filtered.'''
+
+  def __init__(self, db, kind, start, stop, size=None):
+
+    self.db = db
+    self.kind = kind
+    self.start = start
+    self.stop = stop
+    self.size = stop - start if size is None else size
+    self.id = SQLColumn(self, 'id')
+    self.title = SQLColumn(self, 'title')
+
+  def __len__(self):
+
+    return self.size
+
+  def value(self, name, i):
+
+    if i < 0:
+      i += self.stop - self.start
+    return self.db.execute('SELECT %s FROM entries WHERE kind = ? AND row = ?' % name,
+                           (self.kind, self.start + i)).fetchone()[0]
+
+  def published_at(self, i):
+
+    return from_epoch(self.value('published', i), self.value('published_tz', i))
+
+  def updated_after_total(self):
+
+    count, total = self.db.execute(
+      '''SELECT COUNT(*), SUM(after) FROM (
+           SELECT updated - updated % 1000000 - published AS after FROM entries
+           WHERE kind = ? AND row >= ? AND row < ?) WHERE after != 0''',
+      (self.kind, self.start, self.stop)).fetchone()
+    return count, total or 0
+
+
+class SQLFeed(dict):
+  '''Feed in a SQLite database, whose aggregates are computed by queries
+
+  It has what sections use of Feed.  Posts and pages in the window are in
+  rows of their kinds, as entries are sorted by published time as in Feed,
+  comments are those in the window replying to posts in the window.  Top lists
+  are exact, so capacity must be None.'''
+
+  def __init__(self, db):
+
+    super().__init__()
+    self.db = db
+    self.source = None
+    self.capacity = None
+    self.window = (None, None)
+
+  def rows(self, kind, d1=None, d2=None):
+    '''Return the start and stop rows of kind published between d1 and d2'''
+
+    query = 'SELECT COUNT(*) FROM entries WHERE kind = ? AND published %s ?'
+    start = 0 if d2 is None else self.db.execute(query % '>', (kind, d2)).fetchone()[0]
+    if d1 is None:
+      d1 = MIN_US
+    stop = self.db.execute(query % '>=', (kind, d1)).fetchone()[0]
+    return start, max(start, stop)
+
+  def select(self, d1=None, d2=None):
+    '''Return a new SQLFeed of entries published between d1 and d2'''
+
+    f = SQLFeed(self.db)
+    f.update((k, v) for k, v in self.items() if k not in Feed.KINDS)
+    f.source = self.source
+    f.window = (d1, d2)
+    for kind in ('post', 'page', 'draft'):
+      start, stop = f.rows(kind, d1, d2) if kind != 'draft' else f.rows(kind)
+      f[kind] = SQLTable(self.db, kind, start, stop)
+    start, stop = f.rows('comment', d1, d2)
+    f['comment'] = SQLTable(self.db, 'comment', start, stop)
+    f['comment'].size = f.query_comments('COUNT(*)')[0][0]
+    return f
+
+  def query_posts(self, columns, joins='', rest=''):
+    '''Return rows of query of columns of posts in the window as p'''
+
+    posts = self['post']
+    return self.db.execute(
+      '''SELECT %s FROM entries p %s
+         WHERE p.kind = 'post' AND p.row >= ? AND p.row < ? %s''' % (columns, joins, rest),
+      (posts.start, posts.stop)).fetchall()
+
+  def query_comments(self, columns, rest=''):
+    '''Return rows of query of columns of comments in the window as c, which
+    reply to posts in the window as p'''
+
+    comments = self['comment']
+    d1, d2 = self.window
+    return self.db.execute(
+      '''SELECT %s FROM entries c
+         JOIN entries p ON p.kind = 'post' AND p.id = c.reply_to
+         WHERE c.kind = 'comment' AND c.row >= ? AND c.row < ?
+           AND p.published >= ? AND p.published <= ? %s''' % (columns, rest),
+      (comments.start, comments.stop,
+       MIN_US if d1 is None else d1, MAX_US if d2 is None else d2)).fetchall()
+
+  @memoized
+  def terms(self):
+
+    return SQLTerms(self.db)
+
+  @memoized
+  def aggregates(self):
+    '''Dict of each of Cube.KINDS to its aggregates as Feed.aggregates, but
+    labels are counted by names'''
+
+    aggregates = {}
+    for kind, query in (('post', self.query_posts), ('comment', self.query_comments)):
+      alias = kind[0]
+      count, words, chars = query('COUNT(*), SUM({0}.words), SUM({0}.chars)'.format(alias))[0]
+      hours = Counter(dict(query(LOCAL_HOUR.format(alias) + ', COUNT(*)', rest='GROUP BY 1')))
+      aggregates[kind] = dict(count=count, words=words or 0, chars=chars or 0, hours=hours)
+    aggregates['post']['labels'] = Counter(self.label_counts)
+    return aggregates
+
+  @memoized
+  def histograms(self):
+
+    return time_histograms(self.aggregates['post']['hours'],
+                           self.aggregates['comment']['hours'])
+
+  @memoized
+  def label_counts(self):
+    '''Dict of label to the number of posts labeled'''
+
+    return dict(self.query_posts(
+      'l.label, COUNT(*)', "JOIN labels l ON l.kind = 'post' AND l.row = p.row",
+      'GROUP BY l.label'))
+
+  @memoized
+  def label_relations(self):
+    '''Co-occurrences and monthly histograms of labels of posts, see
+    label_relations'''
+
+    rows = self.query_posts('p.row, p.published, p.published_tz, l.label',
+                            "JOIN labels l ON l.kind = 'post' AND l.row = p.row",
+                            'ORDER BY p.row')
+    return label_relations((published, tz, [label for _, _, _, label in g])
+                           for (_, published, tz), g in
+                           groupby(rows, key=itemgetter(0, 1, 2)))
+
+  @memoized
+  def word_counts(self):
+    '''Dict of term ID to the number of its occurrences in posts
+
+    The terms are in the order of their first occurrences.'''
+
+    return dict(self.query_posts('t.term, SUM(t.count)', 'JOIN post_terms t ON t.row = p.row',
+                                 'GROUP BY t.term ORDER BY MIN(t.row * 4294967296 + t.seq)'))
+
+  @memoized
+  def commenter_counts(self):
+    '''Dict of commenter to the number of comments on posts'''
+
+    return dict(self.query_comments('c.author, COUNT(*)', 'GROUP BY c.author'))
+
+  @memoized
+  def commented_posts(self):
+    '''List of (ID, row, number of comments) of commented posts by ID'''
+
+    start = self['post'].start
+    return [(_id, row - start, count) for _id, row, count in
+            self.query_comments('p.id, p.row, COUNT(*)', 'GROUP BY p.row ORDER BY p.id, p.row')]
+
+  @memoized
+  def index(self):
+    '''Index with post_by_id of commented posts only'''
+
+    index = Index(self)
+    index.post_by_id = dict((_id, row) for _id, row, _ in self.commented_posts)
+    return index
+
+
+class SQLTerms(Sequence):
+  '''Terms in a SQLite database by ID'''
+
+  def __init__(self, db):
+
+    self.db = db
+
+  def __len__(self):
+
+    return self.db.execute('SELECT COUNT(*) FROM terms').fetchone()[0]
+
+  def __getitem__(self, i):
+
+    return self.db.execute('SELECT term FROM terms WHERE id = ?', (i,)).fetchone()[0]
+
+
+# ====
+# Dump
+# ====
+
+
+DUMP_FIELDS = ('id', 'published', 'updated', 'updated_after', 'title', 'author',
+               'text', 'words', 'chars', 'in-reply-to', 'label')
+
+
+def iso_duration(td):
+  '''Return timedelta td in ISO 8601 duration format, such as P1DT2H3M4.5S'''
+
+  sign = ''
+  if td < datetime.timedelta(0):
+    sign, td = '-', -td
+  minutes, seconds = divmod(td.seconds, 60)
+  hours, minutes = divmod(minutes, 60)
+  if td.microseconds:
+    seconds = ('%d.%06d' % (seconds, td.microseconds)).rstrip('0')
+  return '%sP%dDT%dH%dM%sS' % (sign, td.days, hours, minutes, seconds)
+
+
+def json_default(o):
+  '''Encode datetimes and timedeltas in ISO 8601 for json'''
+
+  if isinstance(o, datetime.datetime):
+    return o.isoformat()
+  if isinstance(o, datetime.timedelta):
+    return iso_duration(o)
+  raise TypeError('%r is not JSON serializable' % o)
+
+
+def dump_jsonl(f, out, fields=None):
+  '''Write entries of Feed f to out as JSON Lines
+
+  Each line is an object of the kind and the fields of an entry, all fields if
+  fields is None, entries are converted one at a time.'''
+
+  import json
+
+  encoder = json.JSONEncoder(ensure_ascii=False, default=json_default)
+  for kind in f.KINDS:
+    table = f[kind]
+    for i in range(len(table)):
+      e = table.entry(i)
+      d = {'kind': kind}
+      if fields is None:
+        d.update(e)
+      else:
+        d.update((k, e[k]) for k in fields if k in e)
+      out.write(encoder.encode(d))
+      out.write('\n')
+
+
+def dump(f, filename, dump_format='py', fields=None):
+  '''Dump Feed f to filename + '.dump.' + dump_format
+
+  py is the whole feed in pprint, jsonl and jsonl.gz are the entries in JSON
+  Lines, the latter compressed by gzip.'''
+
+  filename_dump = filename + '.dump.' + dump_format
+  if dump_format == 'py':
+    import pprint
+    with open(filename_dump, 'w') as dump_file:
+      pprint.pprint(f.as_dict(), dump_file)
+  elif dump_format == 'jsonl':
+    with open(filename_dump, 'w', encoding='utf-8') as dump_file:
+      dump_jsonl(f, dump_file, fields)
+  else:
+    import gzip
+    with gzip.open(filename_dump, 'wt', encoding='utf-8') as dump_file:
+      dump_jsonl(f, dump_file, fields)
+
+
 def section(text, level=1):
 
   c = ['=', '-', '.'][level]
@@ -121,19 +2023,9 @@ WORD_FREQ_RE = re.compile(r'\b[0-9a-z-\'.]+\b', re.I)
 
 
 def word_freq(text):
+  '''Return a dict of word to the number of occurrences in text by word'''
 
-  wf = {}
-  g = (w.group().lower() for w in WORD_FREQ_RE.finditer(text) if w.group())
-  for k, g in groupby(sorted(g)):
-    wf[k] = sum(1 for _ in g)
-
-  return wf
-
-
-def merge_word_freq(wf, wf1):
-
-  for w, c in wf1.items():
-    wf[w] = c + wf.get(w, 0)
+  return dict(Counter(sorted(w.lower() for w in WORD_FREQ_RE.findall(text))))
 
 
 def calc_others(top_list, total):
@@ -153,66 +2045,316 @@ def gen_toplist(_list, count, total=None):
   return _list
 
 
+# ======
+# Search
+# ======
+
+
+SEARCH_MAGIC = b'BEAS'
+SEARCH_VERSION = 1
+SEARCH_KINDS = ('post', 'comment')
+
+
+def tokenize(text):
+  '''Return the words of text in lowercase as word_freq counts them'''
+
+  return [w.lower() for w in WORD_FREQ_RE.findall(text)]
+
+
+class SearchIndex(object):
+  '''Inverted index of words in titles and texts of posts and comments
+
+  Documents are the posts followed by the comments of a Feed in row order.
+  The postings of a term are the documents having the term, the numbers of
+  occurrences, and the positions of the term in the documents, where a title
+  is one position before its text.  Documents and positions within a document
+  are delta-encoded, and the postings are compressed by zlib.  Terms are
+  sorted and looked up by binary search.'''
+
+  def __init__(self, terms, offsets, dfs, postings, sizes, source):
+
+    self.terms = terms
+    self.offsets = offsets
+    self.dfs = dfs
+    self.postings_buf = postings
+    self.sizes = sizes
+    self.source = source
+
+  @classmethod
+  def build(cls, f):
+
+    import zlib
+
+    postings = {}
+    doc = 0
+    for kind in SEARCH_KINDS:
+      table = f[kind]
+      for title, text in zip(table.title, table.text):
+        positions = {}
+        for pos, word in enumerate(chain(tokenize(title), [None], tokenize(text))):
+          if word is not None:
+            list_it(positions, word, pos)
+        for word, ps in positions.items():
+          p = postings.get(word)
+          if p is None:
+            p = postings[word] = [-1, array('i'), array('i'), array('i')]
+          last, docs, counts, deltas = p
+          docs.append(doc - max(last, 0))
+          counts.append(len(ps))
+          deltas.append(ps[0])
+          deltas.extend(b - a for a, b in zip(ps, ps[1:]))
+          p[0] = doc
+        doc += 1
+
+    terms = sorted(postings)
+    offsets = array('q', [0])
+    dfs = array('i')
+    buf = bytearray()
+    for term in terms:
+      _, docs, counts, deltas = postings.pop(term)
+      buf += zlib.compress(docs.tobytes() + counts.tobytes() + deltas.tobytes())
+      offsets.append(len(buf))
+      dfs.append(len(docs))
+    sizes = tuple(len(f[kind]) for kind in SEARCH_KINDS)
+    return cls(terms, offsets, dfs, buf, sizes, f.source)
+
+  def save(self, filename):
+    '''Save into file in the layout of cache file'''
+
+    blocks = {}
+    filename_tmp = filename + '.tmp'
+    with open(filename_tmp, 'wb') as out:
+
+      def put(key, data, typecode='B'):
+
+        out.write(b'\0' * (-out.tell() % 8))
+        offset = out.tell()
+        out.write(data)
+        blocks[key] = (offset, out.tell() - offset, typecode)
+
+      ends = array('q', [0])
+      data = []
+      for term in self.terms:
+        data.append(term.encode('utf-8'))
+        ends.append(ends[-1] + len(data[-1]))
+      out.write(SEARCH_MAGIC + bytes(12))
+      put('term_ends', ends, 'q')
+      put('term_buf', b''.join(data))
+      put('offsets', self.offsets, 'q')
+      put('dfs', self.dfs, 'i')
+      put('postings', self.postings_buf)
+      header = {
+        'version': SEARCH_VERSION,
+        'byteorder': sys.byteorder,
+        'source': self.source,
+        'sizes': self.sizes,
+        'blocks': blocks,
+      }
+      offset = out.tell()
+      pickle.dump(header, out, pickle.HIGHEST_PROTOCOL)
+      out.seek(len(SEARCH_MAGIC))
+      out.write(struct.pack('=Q', offset))
+    os.replace(filename_tmp, filename)
+
+  @classmethod
+  def load(cls, filename, f):
+    '''Return the SearchIndex in file if it's of Feed f, or None'''
+
+    try:
+      with open(filename, 'rb') as index:
+        mm = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+      return None
+    if mm[:len(SEARCH_MAGIC)] != SEARCH_MAGIC:
+      return None
+    try:
+      offset, = struct.unpack_from('=Q', mm, len(SEARCH_MAGIC))
+      header = pickle.loads(mm[offset:])
+    except Exception:
+      return None
+    sizes = tuple(len(f[kind]) for kind in SEARCH_KINDS)
+    valid = (header.get('version') == SEARCH_VERSION and
+             header.get('byteorder') == sys.byteorder and
+             header['source'] == f.source and header['sizes'] == sizes)
+    if not valid:
+      return None
+
+    buf = memoryview(mm)
+
+    def get(key):
+
+      offset, size, typecode = header['blocks'][key]
+      return buf[offset:offset + size].cast(typecode)
+
+    return cls(StringColumn(get('term_ends'), get('term_buf')), get('offsets'),
+               get('dfs'), get('postings'), sizes, header['source'])
+
+  def postings(self, term):
+    '''Return the documents of term, the numbers of occurrences, and the
+    positions of each document'''
+
+    import zlib
+
+    i = bisect.bisect_left(self.terms, term)
+    if i == len(self.terms) or self.terms[i] != term:
+      return [], [], []
+    data = array('i')
+    data.frombytes(zlib.decompress(self.postings_buf[self.offsets[i]:self.offsets[i + 1]]))
+    n = self.dfs[i]
+    docs = list(accumulate(data[:n]))
+    counts = data[n:2 * n]
+    positions = []
+    start = 2 * n
+    for count in counts:
+      positions.append(list(accumulate(data[start:start + count])))
+      start += count
+    return docs, counts, positions
+
+  def docs(self, words):
+    '''Return the set of documents having words as a phrase'''
+
+    postings = [self.postings(word) for word in words]
+    docs = set(postings[0][0])
+    for p in postings[1:]:
+      docs.intersection_update(p[0])
+    if len(words) == 1 or not docs:
+      return docs
+
+    # positions of the phrase, as of the first word, in each document
+    found = None
+    for k, (ds, _, positions) in enumerate(postings):
+      starts = dict((d, set(p - k for p in ps)) for d, ps in zip(ds, positions) if d in docs)
+      if found is None:
+        found = starts
+      else:
+        found = dict((d, found[d] & starts[d]) for d in found if found[d] & starts[d])
+    return set(found)
+
+
+def load_search_index(filename, f):
+  '''Return the SearchIndex of Feed f of the exported XML file, which is built
+  and saved next to the cache file if there is no valid one'''
+
+  filename_index = filename + '.index'
+  index = SearchIndex.load(filename_index, f)
+  if index is None:
+    index = SearchIndex.build(f)
+    index.save(filename_index)
+  return index
+
+
+def search(f, index, query):
+  '''Return a dict of each of SEARCH_KINDS to the rows of entries of Feed f
+  matching query, in row order
+
+  query has words, "quoted phrases", and label:NAME filters, which all must
+  match.  A comment has the labels of the post it replies to.'''
+
+  import shlex
+
+  docs = None
+  labels = []
+  for token in shlex.split(query):
+    if token.startswith('label:'):
+      labels.append(token[len('label:'):])
+      continue
+    words = tokenize(token)
+    if words:
+      found = index.docs(words)
+      docs = found if docs is None else docs & found
+  if docs is None:
+    docs = range(sum(index.sizes))
+
+  n_posts = index.sizes[0]
+  rows = {
+    'post': sorted(d for d in docs if d < n_posts),
+    'comment': sorted(d - n_posts for d in docs if d >= n_posts),
+  }
+  if labels:
+    label_ids = dict((label, i) for i, label in enumerate(f.labels))
+    posts = None
+    for label in labels:
+      found = set(f.index.posts_by_label.get(label_ids.get(label), ()))
+      posts = found if posts is None else posts & found
+    comments = f['comment']
+    post_by_id = f.index.post_by_id
+    rows['post'] = [i for i in rows['post'] if i in posts]
+    rows['comment'] = [i for i in rows['comment']
+                       if post_by_id.get(comments.ref(i)) in posts]
+  return rows
+
+
 # ========
 # Sections
 # ========
 
 
-def s_filter(args):
+def s_title(f):
 
-  if not args.pubdate:
+  print('= {:=<37s}{:=>37s} ='.format('{} {} '.format(__program__, __version__), ' ' + __website__))
+  print()
+  print(' ', f['title'], 'by', f['author']['name'])
+  print(' ', ddd(next(s for s in f['settings'] if 'BLOG_DESCRIPTION' in s['id'])['content'], 76))
+
+
+def s_filter(pubdate):
+
+  if not pubdate:
     return
 
   section('Filter')
 
   diff = '-----'
-  if args.pubdate[0] and args.pubdate[1]:
-    diff = (args.pubdate[1] - args.pubdate[0]).days
-  print('{0[0]!s:<30} <- {1:5} days -> {0[1]!s:>30}'.format(args.pubdate, diff))
+  if pubdate[0] and pubdate[1]:
+    diff = (pubdate[1] - pubdate[0]).days
+  print('{0[0]!s:<30} <- {1:5} days -> {0[1]!s:>30}'.format(pubdate, diff))
 
 
 def s_general(f):
 
   section('General')
 
-  years = (f['post'][0]['published'] - f['post'][-1]['published']).days / 365
+  posts = f['post']
+  first, last = posts.published_at(-1), posts.published_at(0)
+  years = (last - first).days / 365
   months = 12 * years
-  total_posts = len(f['post'])
-  total_comments = len(f['comment'])
-  total_drafts = len(f.get('draft', []))
+  total_posts = len(posts)
+  total_comments = f.aggregates['comment']['count']
+  total_drafts = len(f['draft'])
   print('{:10,} Posts    {:10,.3f} per year {:8,.3f} per month'.format(
       total_posts, total_posts / years, total_posts / months))
   print('{:10,} Comments {:10,.3f} per year {:8,.3f} per months {:6,.3f} per post'.format(
       total_comments, total_comments / years, total_comments / months, total_comments / total_posts))
   print('{:10,} Pages'.format(len(f['page'])))
   print('{:10,} Drafts'.format(total_drafts))
-  print('{:10,} Labels'.format(len(f['label'])))
+  print('{:10,} Labels'.format(len(f.label_counts)))
   print()
 
   print('{:<30} <- {:4.1f} years -> {:>30}'.format('First post', years, 'Last post'))
   print('{:<30} <- {:3.0f} months -> {:>30}'.format(
-    ddd(f['post'][-1]['title'], 30), months, ddd(f['post'][0]['title'], 30)))
+    ddd(posts.title[-1], 30), months, ddd(posts.title[0], 30)))
   print('{!s:<30} <- {:5} days -> {!s:>30}'.format(
-        f['post'][-1]['published'].strftime('%Y-%m-%d %H:%M:%S %Z'),
-        (f['post'][0]['published'] - f['post'][-1]['published']).days,
-        f['post'][0]['published'].strftime('%Y-%m-%d %H:%M:%S %Z')))
+        first.strftime('%Y-%m-%d %H:%M:%S %Z'),
+        (last - first).days,
+        last.strftime('%Y-%m-%d %H:%M:%S %Z')))
 
 
 def s_posts(f):
 
   section('Posts')
 
-  total_posts = len(f['post'])
+  posts = f['post']
+  total_posts = len(posts)
 
-  updated_posts = tuple(p for p in f['post'] if p['updated_after'])
-  total_updated_after = sum(p['updated_after'].total_seconds() for p in updated_posts)
-  avg_updated_after = datetime.timedelta(seconds=total_updated_after / len(updated_posts))
-  print('{:6,} Posts {:6,} Updated (after {} in average)'.format(total_posts, len(updated_posts), avg_updated_after))
+  updated_posts, total_updated_after = posts.updated_after_total()
+  avg_updated_after = datetime.timedelta(microseconds=total_updated_after / updated_posts)
+  print('{:6,} Posts {:6,} Updated (after {} in average)'.format(total_posts, updated_posts, avg_updated_after))
   print()
 
-  total_words = sum(p['words'] for p in f['post'])
-  total_chars = sum(p['chars'] for p in f['post'])
-  total_labels = sum(len(p.get('label', [])) for p in f['post'])
+  aggregates = f.aggregates['post']
+  total_words = aggregates['words']
+  total_chars = aggregates['chars']
+  total_labels = sum(aggregates['labels'].values())
   print('{:10,} Words  {:10,.3f} per post'.format(total_words, total_words / total_posts))
   print('{:10,} Chars  {:10,.3f} per post'.format(total_chars, total_chars / total_posts))
   print('{:10,} Labels {:10,.3f} per post'.format(total_labels, total_labels / total_posts))
@@ -220,10 +2362,13 @@ def s_posts(f):
 
   num_most_used = int(total_words / total_posts)
   section('{} most used words'.format(num_most_used), level=2)
-  wf = {}
-  for p in f['post']:
-    merge_word_freq(wf, word_freq(p['text']))
-  wf = sorted(wf.items(), key=lambda wf: wf[1], reverse=True)[:num_most_used]
+  if f.capacity:
+    summary = f.word_summary
+    s_summary_note(summary)
+    wf = [(f.terms[term], count) for count, term, _ in summary.top(num_most_used)]
+  else:
+    wf = [(f.terms[term], count) for term, count in
+          heapq.nlargest(num_most_used, f.word_counts.items(), key=itemgetter(1))]
 
   # Find a comforable length: median + 3
   w_len = sorted(len(k) for k, c in wf)
@@ -236,17 +2381,45 @@ def s_posts(f):
   print()
 
 
-def s_posts_comments_grouper(posts, comments, key_fmt):
+def s_summary_note(summary):
+
+  print('Approximate counts of {:,} counters, each may be over by up to {:,}'.format(
+    summary.capacity, summary.error))
+  print()
+
+
+def s_summary(summary, n, name_of):
+  '''Print the top n items of a SpaceSaving with their errors'''
+
+  s_summary_note(summary)
+  top = summary.top(n)
+  _list = gen_toplist([(count, item) for count, item, _ in top], n, summary.total)
+  for (count, item), (_, _, error) in zip(_list, top):
+    print('{:5} ({:5.1f}%): {} (±{})'.format(
+      count, 100 * count / summary.total, name_of(item), error))
+  count, others = _list[-1]
+  print('{:5} ({:5.1f}%): {}'.format(count, 100 * count / summary.total, others))
+
+
+def month_keys(data):
+  '''Return all YYYY-MM keys from the first to the last month of data'''
+
+  m_min = min(data).split('-')
+  m_max = max(data).split('-')
+  min_year, min_month = int(m_min[0]), int(m_min[1])
+  max_year, max_month = int(m_max[0]), int(m_max[1])
+
+  keys = tuple('%d-%02d' % (year, month)
+               for year in range(min_year, max_year + 1)
+               for month in range(1, 12 + 1))
+  return keys[min_month - 1:-(12 - max_month) or None]
+
 
-  kf = lambda p: p['published'].strftime(key_fmt)
-  ig_p = groupby(sorted(posts, key=kf), key=kf)
-  ig_c = groupby(sorted(comments, key=kf), key=kf)
+def year_keys(data):
+  '''Return all years from the first to the last year of data'''
 
-  icount = lambda i: sum(1 for _ in i)
-  d_p = dict((k, icount(g)) for k, g in ig_p)
-  d_c = dict((k, icount(g)) for k, g in ig_c)
-  keys = d_p.keys() | d_c.keys()
-  return dict((key, (d_p.get(key, 0), d_c.get(key, 0))) for key in keys)
+  min_year, max_year = int(min(data)), int(max(data))
+  return tuple(str(key) for key in range(min_year, max_year + 1))
 
 
 def s_two_columns_chart(data, keys, column_names):
@@ -269,7 +2442,7 @@ def s_two_columns_chart(data, keys, column_names):
     print('{:^{key_size}} {:{value_size[0]}} {:>{bar_size[0]}}|{:<{bar_size[1]}} {:{value_size[1]}}'.format(
           key,
           count[0],
-          '#' * int(bar_size[0] * count[0] / max_c1_count),
+          '#' * int(bar_size[0] * count[0] / (max_c1_count or 1)),
           '#' * int(bar_size[1] * count[1] / (max_c2_count or 1)),
           count[1],
           key_size=column_sizes[0],
@@ -282,52 +2455,35 @@ def s_posts_comments(f):
 
   section('Posts and Comments Published Time')
 
-  posts = f['post']
-  comments = f['comment']
+  histograms = f.histograms
 
   section('By Year and Month', level=2)
 
-  m_pc = s_posts_comments_grouper(posts, comments, '%Y-%m')
-
-  m_pc_keys = m_pc.keys()
-  m_min = min(m_pc_keys).split('-')
-  m_max = max(m_pc_keys).split('-')
-  min_year, min_month = int(m_min[0]), int(m_min[1])
-  max_year, max_month = int(m_max[0]), int(m_max[1])
-  del m_pc_keys, m_min, m_max
+  m_pc = histograms['%Y-%m']
 
-  keys = tuple('%d-%02d' % (year, month)
-               for year in range(min_year, max_year + 1)
-               for month in range(1, 12 + 1))
-  keys = keys[min_month - 1:-(12 - max_month) or None]
-  s_two_columns_chart(m_pc, keys, ('YYYY-MM', 'Posts', 'Comments'))
+  s_two_columns_chart(m_pc, month_keys(m_pc), ('YYYY-MM', 'Posts', 'Comments'))
 
   section('By Year', level=2)
 
-  m_pc = s_posts_comments_grouper(posts, comments, '%Y')
-
-  m_pc_keys = m_pc.keys()
-  min_year, max_year = int(min(m_pc_keys)), int(max(m_pc_keys))
-  del m_pc_keys
-
-  keys = tuple(str(key) for key in range(min_year, max_year + 1))
-  s_two_columns_chart(m_pc, keys, ('Year', 'Posts', 'Comments'))
+  m_pc = histograms['%Y']
+  s_two_columns_chart(m_pc, year_keys(m_pc), ('Year', 'Posts', 'Comments'))
 
   section('By Month of Year', level=2)
 
-  m_pc = s_posts_comments_grouper(posts, comments, '%m')
+  m_pc = histograms['%m']
   keys = tuple('%02d' % key for key in range(1, 12 + 1))
   s_two_columns_chart(m_pc, keys, ('Month', 'Posts', 'Comments'))
 
   section('By Day of Month', level=2)
 
-  m_pc = s_posts_comments_grouper(posts, comments, '%d')
+  m_pc = histograms['%d']
   keys = tuple('%02d' % key for key in range(1, 31 + 1))
   s_two_columns_chart(m_pc, keys, ('Day', 'Posts', 'Comments'))
 
   section('By Hour of Day', level=2)
 
-  keys = tuple('%02d' % key for key in range(1, 24 + 1))
+  m_pc = histograms['%H']
+  keys = tuple('%02d' % key for key in range(24))
   s_two_columns_chart(m_pc, keys, ('Hour', 'Posts', 'Comments'))
 
 
@@ -335,10 +2491,7 @@ def s_punchcard(f):
 
   section('Punchcard')
 
-  posts = f['post']
-  comments = f['comment']
-
-  m_pc = s_posts_comments_grouper(posts, comments, '%w-%H')
+  m_pc = f.histograms['%w-%H']
 
   punches = ' .oO00'
   len_punches = len(punches) - 1
@@ -370,16 +2523,28 @@ def s_comments(f):
 
   section('Comments')
 
-  comments = [c for c in f['comment'] if 'in-reply-to' in c]
-  if not comments:
+  comments = f['comment']
+  posts = f['post']
+  if f.capacity:
+    post_by_id = f.index.post_by_id
+    post_refs = set(i for i, ref in enumerate(f.refs) if ref in post_by_id)
+    total_comments = 0
+    commented_refs = set()
+    for ref in comments.reply_to:
+      if ref in post_refs:
+        total_comments += 1
+        commented_refs.add(ref)
+    commented_posts = len(commented_refs)
+  else:
+    commented = f.commented_posts
+    total_comments = sum(count for _, _, count in commented)
+    commented_posts = len(commented)
+  if not total_comments:
     print('  No comments')
     return
 
-  total_comments = len(comments)
-  posts = f['post']
   total_posts = len(posts)
 
-  commented_posts = len(set(c['in-reply-to']['ref'] for c in comments))
   print('{:5} comments commented on {:5} ({:5.1f}%) of {:5} posts'.format(
     total_comments,
     commented_posts,
@@ -388,38 +2553,51 @@ def s_comments(f):
   print()
 
   print('{:5} out of {} Comments are not counted in this section.'.format(
-    len(f['comment']) - total_comments,
-    len(f['comment'])))
+    len(comments) - total_comments,
+    len(comments)))
 
-  genlist = lambda kf: gen_toplist(list(islice(sorted(
-      [(sum(1 for _ in g), k) for k, g in groupby(sorted(comments, key=kf), key=kf)],
-      reverse=True), 10)), 10, total_comments)
+  genlist = lambda counts: gen_toplist(list(islice(sorted(counts, reverse=True), 10)), 10, total_comments)
+
+  def post_title(ref, width=78 - 5 - 9 - 2):
+
+    if ref.startswith('tag:blogger.com'):
+      return ddd(posts.title[f.index.post_by_id[ref]], width)
+    return ref
 
   section('Top Commenters', level=2)
-  _list = genlist(lambda c: c['author']['name'])
-  for count, name in _list:
-    print('{:5} ({:5.1f}%): {}'.format(count, 100 * count / total_comments, name))
+  if f.capacity:
+    s_summary(f.commenter_summary, 10, f.authors.__getitem__)
+  else:
+    _list = genlist((count, name) for name, count in f.commenter_counts.items())
+    for count, name in _list:
+      print('{:5} ({:5.1f}%): {}'.format(count, 100 * count / total_comments, name))
 
   section('Most Commented Posts', level=2)
-  _list = genlist(lambda c: c['in-reply-to']['ref'])
-  for count, ref in _list:
-    if ref.startswith('tag:blogger.com'):
-      title = ddd(next(p for p in posts if p['id'] == ref)['title'], 78 - 5 - 9 - 2)
-    else:
-      title = ref
-    print('{:5} ({:5.1f}%): {}'.format(count, 100 * count / total_comments, title))
+  if f.capacity:
+    s_summary(f.commented_summary, 10,
+              lambda ref: post_title(f.refs[ref], 78 - 5 - 9 - 2 - 8))
+  else:
+    _list = genlist((count, ref) for ref, _, count in commented)
+    for count, ref in _list:
+      print('{:5} ({:5.1f}%): {}'.format(count, 100 * count / total_comments, post_title(ref)))
 
   section('Most Commented Posts Over Days Since Published aka. Popular Posts', level=2)
-  kf = lambda c: c['in-reply-to']['ref']
-  # FIXME BAD, SUPER BAD
+  if f.capacity:
+    print('Approximate candidates of {:,} counters, by guaranteed numbers of comments'.format(
+      f.capacity))
+    print()
+    counts = [(count - error, post_by_id[f.refs[ref]])
+              for count, ref, error in f.commented_summary.top(f.capacity) if ref in post_refs]
+  else:
+    counts = [(count, post) for _, post, count in commented]
   g = sorted(
-      [(count / (datetime.datetime.now(post['published'].tzinfo) - post['published']).days, post) for count, post in (
-        (sum(1 for _ in g), next(p for p in posts if p['id'] == k)) for k, g in groupby(sorted(comments, key=kf), key=kf))],
+      [(count / (datetime.datetime.now(published.tzinfo) - published).days, post) for count, post, published in (
+        (count, post, posts.published_at(post)) for count, post in counts)],
       key=lambda item: item[0],
       reverse=True
   )
   for count, post in islice(g, 10):
-    title = ddd(post['title'], 78 - 5 - 2)
+    title = ddd(posts.title[post], 78 - 5 - 2)
     print('{:.3f}: {}'.format(count, title))
 
 
@@ -427,13 +2605,15 @@ def s_labels(f):
 
   section('Labels')
 
-  genlist = lambda reverse=True: sorted(
-      ((sum(1 for _ in g), k) for k, g in groupby(sorted(chain.from_iterable(p.get('label', []) for p in f['post'])))),
-      reverse=reverse)
-
-  labels = genlist()
-  total_labels = len(f['label'])
-  total_labeled = sum(count for count, label in labels)
+  if f.capacity:
+    label_counts = f.aggregates['post']['labels']
+    total_labels = len(label_counts)
+    total_labeled = f.label_summary.total
+  else:
+    labels = sorted(((count, label) for label, count in f.label_counts.items()),
+                    reverse=True)
+    total_labels = len(f.label_counts)
+    total_labeled = sum(count for count, label in labels)
   if not total_labeled:
     print('  No labels')
     return
@@ -441,17 +2621,568 @@ def s_labels(f):
   print('{:10,} Labels labled {:10,} times {:10.3f} Labeled per label'.format(total_labels, total_labeled, total_labeled / total_labels))
 
   section('Most Labeled Labels', level=2)
-  _list = gen_toplist(labels, 10)
-  for count, label in _list:
-    print('{:5} ({:5.1f}%): {}'.format(count, 100 * count / total_labeled, label))
+  if f.capacity:
+    s_summary(f.label_summary, 10, f.labels.__getitem__)
+  else:
+    _list = gen_toplist(labels, 10)
+    for count, label in _list:
+      print('{:5} ({:5.1f}%): {}'.format(count, 100 * count / total_labeled, label))
 
   section('Least Labeled Rate', level=2)
-  labels = genlist(False)
-  for count, labels2 in islice(groupby(labels, key=lambda l: l[0]), 10):
-    labels_count = sum(1 for _ in labels2)
+  if f.capacity:
+    rates = sorted(Counter(label_counts.values()).items())
+  else:
+    labels.reverse()
+    rates = ((count, sum(1 for _ in labels2))
+             for count, labels2 in groupby(labels, key=lambda l: l[0]))
+  for count, labels_count in islice(rates, 10):
     print('{:5} ({:5.1f}%) Labels labeled {:3} times'.format(labels_count, 100 * labels_count / total_labels, count))
 
 
+def top_labels(f, n=10):
+  '''Return the list of (count, label) of the n most labeled labels'''
+
+  return heapq.nsmallest(n, ((-count, label) for label, count in f.label_counts.items()))
+
+
+def s_related_labels(f):
+
+  section('Related Labels')
+
+  pairs, _ = f.label_relations
+  if not pairs:
+    print('  No labels labeled together')
+    return
+
+  total_posts = len(f['post'])
+  section('Most Labeled Together', level=2)
+  for (a, b), count in heapq.nsmallest(10, pairs.items(), key=lambda item: (-item[1], item[0])):
+    print('{:5} ({:5.1f}%): {} + {}'.format(count, 100 * count / total_posts, a, b))
+
+  related = {}
+  for (a, b), count in pairs.items():
+    list_it(related, a, (-count, b))
+    list_it(related, b, (-count, a))
+
+  section('Related Labels of Most Labeled Labels', level=2)
+  for count, label in top_labels(f):
+    print('{:5} {}'.format(-count, label))
+    for count2, label2 in heapq.nsmallest(5, related.get(label, [])):
+      print('    {:5} ({:5.1f}%): {}'.format(-count2, 100 * count2 / count, label2))
+
+
+def s_label_trends(f):
+
+  section('Label Trends')
+
+  _, months = f.label_relations
+  if not months:
+    print('  No labels')
+    return
+
+  last_month = max(max(counts) for counts in months.values())
+  first_month = min(min(counts) for counts in months.values())
+  years = [str(y) for y in range(int(first_month[:4]), int(last_month[:4]) + 1)][-10:]
+  label_size = 78 - 6 * len(years)
+  labels = top_labels(f)
+
+  section('Most Labeled Labels by Year', level=2)
+  print('{:{}}'.format('Label', label_size) + ''.join(' {:>5}'.format(y) for y in years))
+  for _, label in labels:
+    counts = Counter()
+    for month, count in months[label].items():
+      counts[month[:4]] += count
+    print('{:{}}'.format(ddd(label, label_size), label_size) +
+          ''.join(' {:5}'.format(counts[y]) for y in years))
+
+  # the last 12 months up to the last month with labels
+  n = 12 * int(last_month[:4]) + int(last_month[5:]) - 1
+  recent = ['%d-%02d' % (m // 12, m % 12 + 1) for m in range(n - 11, n + 1)]
+  section('Most Labeled Labels of 12 Months since {}'.format(recent[0]), level=2)
+  counts = sorted(((sum(counts[m] for m in recent), label) for label, counts in months.items()),
+                  key=lambda item: (-item[0], item[1]))
+  for count, label in islice(counts, 10):
+    if not count:
+      break
+    total = sum(months[label].values())
+    print('{:5} ({:5.1f}% of {:5}): {}'.format(count, 100 * count / total, total, label))
+
+
+def s_search(f, hits, query, window=(None, None)):
+
+  section('Search')
+
+  print('{:>10} {}'.format('Query', query))
+  rows = {}
+  for kind in SEARCH_KINDS:
+    start, stop = f[kind].published_between(*window)
+    rows[kind] = [i for i in hits[kind] if start <= i < stop]
+  print('{:10,} Posts'.format(len(rows['post'])))
+  print('{:10,} Comments'.format(len(rows['comment'])))
+  if not rows['post'] and not rows['comment']:
+    return
+
+  m_pc = {}
+  for i, kind in enumerate(SEARCH_KINDS):
+    table = f[kind]
+    for row in rows[kind]:
+      month = table.published_at(row).strftime('%Y-%m')
+      m_pc.setdefault(month, [0, 0])[i] += 1
+  y_pc = {}
+  for month, counts in m_pc.items():
+    year = y_pc.setdefault(month[:4], [0, 0])
+    year[0] += counts[0]
+    year[1] += counts[1]
+
+  section('Hits By Year and Month', level=2)
+  s_two_columns_chart(m_pc, month_keys(m_pc), ('YYYY-MM', 'Posts', 'Comments'))
+
+  section('Hits By Year', level=2)
+  s_two_columns_chart(y_pc, year_keys(y_pc), ('Year', 'Posts', 'Comments'))
+
+  if rows['post']:
+    section('Latest Posts', level=2)
+    posts = f['post']
+    for i in rows['post'][:10]:
+      print('{:%Y-%m-%d} {}'.format(posts.published_at(i), ddd(posts.title[i], 67)))
+
+
+def s_network(n):
+
+  section('Network')
+
+  total_posts = sum(posts for _, posts, _ in n.blogs)
+  total_comments = sum(comments for _, _, comments in n.blogs)
+  print('{:5} blogs {:10,} posts {:10,} comments'.format(len(n.blogs), total_posts, total_comments))
+
+  section('Blogs', level=2)
+  for title, posts, comments in n.blogs:
+    print('{:8,} posts {:8,} comments: {}'.format(posts, comments, ddd(title, 78 - 14 - 18)))
+
+  section('Top Commenters Across Blogs', level=2)
+  if n.capacity:
+    total = n.commenter_counts.total
+  else:
+    total = sum(n.commenter_counts.values())
+  if not total:
+    print('  No comments')
+  elif n.capacity:
+    s_summary_note(n.commenter_counts)
+    top = n.commenter_counts.top(10)
+    _list = gen_toplist([(count, name) for count, name, _ in top], 10, total)
+    for (count, name), (_, _, error) in zip(_list, top):
+      blogs = n.commenter_blogs.counts.get(name, (0,))[0]
+      print('{:5} ({:5.1f}%) on {:3} blogs: {} (±{})'.format(count, 100 * count / total, blogs, name, error))
+    count, others = _list[-1]
+    print('{:5} ({:5.1f}%){:14}{}'.format(count, 100 * count / total, '', others))
+  else:
+    _list = gen_toplist(sorted(((count, name) for name, count in n.commenter_counts.items()), reverse=True), 10, total)
+    for count, name in _list[:-1]:
+      print('{:5} ({:5.1f}%) on {:3} blogs: {}'.format(count, 100 * count / total, n.commenter_blogs[name], name))
+    count, others = _list[-1]
+    print('{:5} ({:5.1f}%){:14}{}'.format(count, 100 * count / total, '', others))
+
+  if total_posts or total_comments:
+    s_punchcard(n)
+
+
+SECTIONS = OrderedDict((
+  ('general', s_general),
+  ('posts', s_posts),
+  ('comments', s_comments),
+  ('posts_comments', s_posts_comments),
+  ('punchcard', s_punchcard),
+  ('labels', s_labels),
+  ('related_labels', s_related_labels),
+  ('label_trends', s_label_trends),
+))
+
+
+# =======
+# Profile
+# =======
+
+
+class Phase(object):
+  '''Context manager of a phase of a Profile, doing nothing without Profile'''
+
+  def __init__(self, profile=None, name=None):
+
+    self.profile = profile
+    self.name = name
+
+  def __enter__(self):
+
+    if self.profile:
+      self.profile.enter(self.name)
+
+  def __exit__(self, *exc_info):
+
+    if self.profile:
+      self.profile.exit()
+
+
+NO_PHASE = Phase()
+
+
+class Profile(object):
+  '''Wall time, CPU time, and peak memory usages of phases
+
+  Phases can be nested and entered many times, the times are summed.  Peak RSS
+  is the process's maximal resident set size by the end of a phase, peak traced
+  is the most memory allocated by Python during a phase, traced by
+  tracemalloc.  A disabled Profile records nothing.
+
+  Each thread has its own stack of phases entered, which starts as the phases
+  the creating thread is in when the thread enters its first phase.'''
+
+  def __init__(self, enabled=True):
+
+    import threading
+
+    self.enabled = enabled
+    self.phases = OrderedDict()
+    self.local = threading.local()
+    self.main_stack = self.local.stack = []
+    if enabled:
+      import tracemalloc
+      if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+  def __getstate__(self):
+
+    return dict(enabled=self.enabled, phases=self.phases)
+
+  def __setstate__(self, state):
+
+    import threading
+
+    self.__dict__.update(state)
+    self.local = threading.local()
+    self.main_stack = self.local.stack = []
+
+  @property
+  def stack(self):
+
+    try:
+      return self.local.stack
+    except AttributeError:
+      self.local.stack = list(self.main_stack)
+      return self.local.stack
+
+  def phase(self, name):
+
+    return Phase(self, name) if self.enabled else NO_PHASE
+
+  def enter(self, name):
+
+    self.update_traced_peak()
+    record = self.phases.get(name)
+    if record is None:
+      record = self.phases[name] = dict(depth=len(self.stack), calls=0,
+                                        wall=0.0, cpu=0.0,
+                                        rss_peak=0, traced_peak=0)
+    record['calls'] += 1
+    self.stack.append((record, time.perf_counter(), time.process_time()))
+
+  def exit(self):
+
+    self.update_traced_peak()
+    record, wall, cpu = self.stack.pop()
+    record['wall'] += time.perf_counter() - wall
+    record['cpu'] += time.process_time() - cpu
+    record['rss_peak'] = max(record['rss_peak'], rss_peak())
+
+  def update_traced_peak(self):
+    '''Update peak traced of the phases being entered and reset the peak'''
+
+    import tracemalloc
+    peak = tracemalloc.get_traced_memory()[1]
+    for record, _, _ in self.stack:
+      record['traced_peak'] = max(record['traced_peak'], peak)
+    if hasattr(tracemalloc, 'reset_peak'):
+      tracemalloc.reset_peak()
+
+  def update(self, profile):
+    '''Add the phases of another Profile'''
+
+    for name, other in profile.phases.items():
+      record = self.phases.setdefault(name, dict(other, calls=0, wall=0.0, cpu=0.0))
+      for key in ('calls', 'wall', 'cpu'):
+        record[key] += other[key]
+      for key in ('rss_peak', 'traced_peak'):
+        record[key] = max(record[key], other[key])
+
+  def as_list(self):
+
+    return [dict(record, name=name) for name, record in self.phases.items()]
+
+  def print_table(self, file=sys.stderr):
+
+    MB = 1024 * 1024
+    print('{:36} {:>6} {:>8} {:>8} {:>8} {:>8}'.format(
+      'Phase', 'Calls', 'Wall s', 'CPU s', 'RSS MB', 'Py MB'), file=file)
+    for name, r in self.phases.items():
+      print('{:36} {:6} {:8.3f} {:8.3f} {:8.1f} {:8.1f}'.format(
+        ddd('  ' * r['depth'] + name, 36), r['calls'], r['wall'], r['cpu'],
+        r['rss_peak'] / MB, r['traced_peak'] / MB), file=file)
+
+
+def rss_peak():
+  '''Return the peak resident set size of the process in bytes, 0 if unknown'''
+
+  try:
+    import resource
+  except ImportError:
+    return 0
+  rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return rss if sys.platform == 'darwin' else rss * 1024
+
+
+NO_PROFILE = Profile(False)
+
+
+# ======
+# Server
+# ======
+
+
+def capture(func, *args):
+  '''Return what func prints when called with args'''
+
+  import contextlib
+  import io
+
+  output = io.StringIO()
+  with contextlib.redirect_stdout(output):
+    func(*args)
+  return output.getvalue()
+
+
+class Server(object):
+  '''Reports of exported XML files of paths from Feeds kept in memory
+
+  Feeds, their selected windows, and rendered reports are kept in one least
+  recently used order, the least recently used are dropped when the total of
+  their sizes is over memory bytes, even the only Feed.  The size of a Feed is
+  estimated by the size of its cache file, a window by its share of entries of
+  the Feed, see window_size, and a report by its length.  A Feed is reloaded
+  with its windows and reports dropped when the size or the modification time
+  of its XML file changes.'''
+
+  def __init__(self, paths, memory, jobs=1):
+
+    self.paths = paths
+    self.memory = memory
+    self.jobs = jobs
+    # (kind, filename, ...) to [value, size], kind is feed, window, or report
+    self.entries = OrderedDict()
+    self.size = 0
+
+  def filename(self, path):
+    '''Return the real path of XML file path if it's served, or None'''
+
+    path = os.path.realpath(path)
+    if ('feed', path) in self.entries:
+      return path
+    if path in map(os.path.realpath, xml_files(self.paths)):
+      return path
+    return None
+
+  def get(self, key):
+
+    entry = self.entries.get(key)
+    if entry is None:
+      return None
+    self.entries.move_to_end(key)
+    return entry[0]
+
+  def put(self, key, value, size):
+
+    if key in self.entries:
+      self.drop(key)
+    self.entries[key] = [value, size]
+    self.size += size
+    self.evict()
+
+  def drop(self, key):
+    '''Drop the entry of key, and the windows and reports of a Feed'''
+
+    self.size -= self.entries.pop(key)[1]
+    if key[0] == 'feed':
+      for k in [k for k in self.entries if k[1] == key[1]]:
+        self.size -= self.entries.pop(k)[1]
+
+  def evict(self):
+
+    while self.entries and self.size > self.memory:
+      self.drop(next(iter(self.entries)))
+
+  def feed(self, filename):
+    '''Return the Feed of XML file, loading it if needed'''
+
+    key = ('feed', filename)
+    f = self.get(key)
+    if f is not None and f.source[:2] != stat_source(filename):
+      self.drop(key)
+      f = None
+    if f is None:
+      f = load(filename, jobs=self.jobs)
+      self.put(key, f, os.path.getsize(filename + '.cache'))
+    return f
+
+  def report(self, filename, sections, pubdates, capacity=None, fmt='text'):
+    '''Return the report of XML file in text or JSON
+
+    pubdates is a list of windows as --pubdate, each is reported with the
+    given sections.'''
+
+    f = self.feed(filename)
+    key = ('report', filename, tuple(sections), tuple(pubdates), capacity, fmt)
+    body = self.get(key)
+    if body is not None:
+      return body
+
+    feed_size = os.path.getsize(filename + '.cache')
+    windows = []
+    for pubdate in pubdates or [None]:
+      window_key = ('window', filename, pubdate, capacity)
+      g = self.get(window_key)
+      if g is None:
+        g = select(f, pubdate, capacity)
+      texts = OrderedDict((name, capture(SECTIONS[name], g)) for name in sections)
+      windows.append((pubdate, texts))
+      # sized after the sections, which compute most of what the window keeps
+      self.put(window_key, g, window_size(f, g, feed_size))
+
+    if fmt == 'json':
+      import json
+      json_windows = []
+      for pubdate, texts in windows:
+        if pubdate:
+          pubdate = [d.isoformat() if d else None for d in pubdate]
+        json_windows.append(OrderedDict((('pubdate', pubdate), ('sections', texts))))
+      body = json.dumps(OrderedDict((
+        ('xml', filename),
+        ('title', f['title']),
+        ('author', f['author']['name']),
+        ('windows', json_windows),
+      )))
+    else:
+      body = capture(s_title, f)
+      for pubdate, texts in windows:
+        body += capture(s_filter, pubdate) + ''.join(texts.values())
+    body = body.encode('utf-8')
+    self.put(key, body, len(body))
+    return body
+
+
+def window_size(f, g, size):
+  '''Return the estimated bytes kept by Feed g selected from Feed f of size
+  bytes
+
+  The index, the aggregates, and the filtered comments of a window take about
+  a twentieth of the Feed's size plus half of its share of the Feed's entries.'''
+
+  entries = len(f['post']) + len(f['comment'])
+  share = (len(g['post']) + len(g['comment'])) / entries if entries else 0
+  return int(size * (0.05 + 0.5 * share))
+
+
+def pubdate_type(pubdate):
+  '''Return the window of "d1,d2" as a pair of datetimes or None'''
+
+  d1, d2 = pubdate.split(',')
+  return date_type(d1), date_type(d2)
+
+
+def serve(address, server):
+  '''Serve reports of Server server over HTTP on address
+
+  address is PORT or HOST:PORT, HOST is localhost by default, or the path of a
+  Unix socket if it has a slash.  Requests are like:
+
+    GET /report?xml=FILE&sections=NAME,NAME&pubdate=D1,D2&format=json
+
+  sections, pubdate, top-capacity, and format are optional, pubdate can be
+  given many times.'''
+
+  import socketserver
+  import stat
+  from http.server import BaseHTTPRequestHandler, HTTPServer
+  from urllib.parse import parse_qs, urlsplit
+
+  class Handler(BaseHTTPRequestHandler):
+
+    def address_string(self):
+
+      return self.client_address[0] if self.client_address else address
+
+    def do_GET(self):
+
+      url = urlsplit(self.path)
+      if url.path != '/report':
+        self.send_error(404)
+        return
+      query = parse_qs(url.query, keep_blank_values=True)
+      try:
+        filename = server.filename(query['xml'][0])
+        sections = sections_type(query.get('sections', [','.join(SECTIONS)])[0])
+        pubdates = [pubdate_type(pubdate) for pubdate in query.get('pubdate', [])]
+        capacity = query.get('top-capacity')
+        capacity = int(capacity[0]) if capacity else None
+        if capacity is not None and capacity < 1:
+          raise ValueError('top-capacity must be positive')
+        fmt = query.get('format', ['text'])[0]
+        if fmt not in ('text', 'json'):
+          raise ValueError('unknown format: %s' % fmt)
+      except KeyError as e:
+        self.send_error(400, 'missing %s' % e)
+        return
+      except (ValueError, argparse.ArgumentTypeError) as e:
+        self.send_error(400, str(e))
+        return
+      if filename is None:
+        self.send_error(404, 'XML file not served')
+        return
+
+      try:
+        body = server.report(filename, sections, pubdates, capacity, fmt)
+      except Exception as e:
+        self.send_error(500, '%s: %s' % (type(e).__name__, e))
+        return
+      self.send_response(200)
+      self.send_header('Content-Type', 'application/json' if fmt == 'json'
+                       else 'text/plain; charset=utf-8')
+      self.send_header('Content-Length', str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+  if '/' in address:
+    if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+      os.remove(address)
+
+    class UnixHTTPServer(socketserver.UnixStreamServer, HTTPServer):
+
+      def server_bind(self):
+
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = address, 0
+
+    httpd = UnixHTTPServer(address, Handler)
+  else:
+    host, _, port = address.rpartition(':')
+    httpd = HTTPServer((host or 'localhost', int(port)), Handler)
+  try:
+    httpd.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    httpd.server_close()
+    if '/' in address:
+      os.remove(address)
+
+
 # ====
 # Main
 # ====
@@ -464,64 +3195,258 @@ def date_type(d):
   return None
 
 
+def fields_type(names):
+
+  names = names.split(',')
+  for name in names:
+    if name not in DUMP_FIELDS:
+      raise argparse.ArgumentTypeError('unknown field: %s' % name)
+  return names
+
+
+def sections_type(names):
+
+  names = names.split(',')
+  for name in names:
+    if name not in SECTIONS:
+      raise argparse.ArgumentTypeError('unknown section: %s' % name)
+  return names
+
+
+def search_type(query):
+
+  import shlex
+
+  try:
+    shlex.split(query)
+  except ValueError as e:
+    raise argparse.ArgumentTypeError('%s: %s' % (e, query))
+  return query
+
+
+def xml_files(paths):
+  '''Return the list of files of paths, directories expanded to their XML files,
+  compressed or not'''
+
+  files = []
+  for path in paths:
+    if os.path.isdir(path):
+      files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                          if name.endswith(XML_SUFFIXES)))
+    else:
+      files.append(path)
+  return files
+
+
+def load(filename, base=None, jobs=1, profile=NO_PROFILE):
+  '''Return the Feed of the exported XML file from its cache, or parsed and
+  saved into the cache, reusing entries from cache file base'''
+
+  filename_cache = filename + '.cache'
+  with profile.phase('load cache'):
+    f = load_cache(filename_cache, filename)
+  if f is None:
+    with profile.phase('load base cache'):
+      base = load_cache(base or filename_cache)
+    with profile.phase('parse'):
+      f = load_feed(filename, jobs, base, profile)
+    del base
+    with profile.phase('save cache'):
+      save_cache(filename_cache, f)
+  return f
+
+
+def select(f, pubdate, capacity=None, profile=NO_PROFILE):
+  '''Return Feed f selected by pubdate, a pair of datetimes or None
+
+  Comments of the selected Feed are filtered in phase filter comments of
+  profile when they are first accessed.'''
+
+  if pubdate:
+    f = f.select(*(to_epoch(d)[0] if d else None for d in pubdate))
+  else:
+    f = f.select()
+  f.capacity = capacity
+  f.profile = profile
+  return f
+
+
+def report(filename, args, jobs=1, profile=NO_PROFILE):
+  '''Print the report of the exported XML file and return the reported Feeds
+
+  Every pubdate window is reported by its own Feed selected from the feed.'''
+
+  if args.backend == 'sqlite':
+    filename_db = filename + '.sqlite'
+    with profile.phase('load database'):
+      f = load_database(filename_db, filename)
+    if f is None:
+      with profile.phase('load base cache'):
+        base = load_cache(args.base or filename + '.cache')
+      with profile.phase('parse into database'):
+        save_database(filename_db, filename, jobs, base, profile)
+      del base
+      f = load_database(filename_db)
+      if f is None:
+        raise RuntimeError('%s: saved database can not be loaded' % filename_db)
+  else:
+    f = load(filename, args.base, jobs, profile)
+  if args.dump:
+    with profile.phase('dump'):
+      feed = f if args.backend != 'sqlite' else load(filename, args.base, jobs, profile)
+      dump(feed, filename, args.dump_format, args.dump_fields)
+
+  if args.search is not None:
+    with profile.phase('search index'):
+      index = load_search_index(filename, f)
+    with profile.phase('search'):
+      hits = search(f, index, args.search)
+
+  s_title(f)
+
+  feeds = []
+  for pubdate in args.pubdate or [None]:
+    # filter
+    with profile.phase('select'):
+      feeds.append(select(f, pubdate, args.top_capacity, profile))
+
+    s_filter(pubdate)
+
+    if args.search is not None:
+      with profile.phase('section search'):
+        s_search(f, hits, args.search, feeds[-1].window)
+      continue
+    for name in args.sections:
+      with profile.phase('section ' + name):
+        SECTIONS[name](feeds[-1])
+  return feeds
+
+
+def report_network(filename, args):
+  '''Return the report of the exported XML file, Networks of its windows, and
+  Profile'''
+
+  import contextlib
+  import io
+
+  profile = Profile(args.profile)
+  output = io.StringIO()
+  with contextlib.redirect_stdout(output):
+    feeds = report(filename, args, profile=profile)
+  networks = []
+  for f in feeds:
+    networks.append(Network(f.capacity))
+    networks[-1].add(f)
+  return output.getvalue(), networks, profile
+
+
 def main():
 
   parser = argparse.ArgumentParser(description=__description__)
   parser.add_argument('-v', '--version', action='version',
                       version='%(prog)s ' + __version__)
-  parser.add_argument('xml', help='Exported XML file')
+  parser.add_argument('xml', nargs='+',
+                      help='exported XML files or directories of them, more '
+                           'than one are reported with a combined report')
   parser.add_argument('-d', '--dump', action='store_true',
                       help='dump cache to readable file')
-  parser.add_argument('--pubdate', nargs=2, type=date_type,
-                      metavar='YYYY-MM-DDTHH:MM:SS+HHMM')
+  parser.add_argument('--dump-format', choices=('py', 'jsonl', 'jsonl.gz'),
+                      default='py',
+                      help='format of dump file, Python literal of the whole '
+                           'feed or JSON Lines of entries (default: '
+                           '%(default)s)')
+  parser.add_argument('--dump-fields', type=fields_type,
+                      metavar='NAME[,NAME...]',
+                      help='fields of entries to dump in JSON Lines, from %s '
+                           '(default: all)' % ', '.join(DUMP_FIELDS))
+  parser.add_argument('--pubdate', nargs=2, type=date_type, action='append',
+                      metavar='YYYY-MM-DDTHH:MM:SS+HHMM',
+                      help='report entries published in the window, can be '
+                           'given many times for many reports')
+  parser.add_argument('--base', metavar='CACHE',
+                      help='reuse unchanged entries from the cache file of a '
+                           'previous export (default: the outdated cache file '
+                           'of xml)')
+  parser.add_argument('-s', '--sections', type=sections_type,
+                      default=list(SECTIONS), metavar='NAME[,NAME...]',
+                      help='sections to report, in the given order, from %s '
+                           '(default: all)' % ', '.join(SECTIONS))
+  parser.add_argument('--search', type=search_type, metavar='QUERY',
+                      help='report posts and comments matching words, '
+                           '"phrases", and label:NAME filters of QUERY '
+                           'instead of the sections')
+  parser.add_argument('--top-capacity', type=int, metavar='N',
+                      help='approximate top lists in fixed memory with N '
+                           'counters each, reporting the errors')
+  parser.add_argument('--backend', choices=('memory', 'sqlite'), default='memory',
+                      help='compute sections from the feed in memory, or by '
+                           'queries of a SQLite database of it (default: '
+                           '%(default)s)')
+  parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                      help='extract texts, or process files of more than one, '
+                           'with N processes, 0 for the number of CPUs '
+                           '(default: %(default)s)')
+  parser.add_argument('--serve', metavar='[HOST:]PORT|SOCKET',
+                      help='serve reports of xml over HTTP on localhost PORT '
+                           'or Unix SOCKET path, keeping feeds in memory')
+  parser.add_argument('--serve-memory', type=int, default=512, metavar='MB',
+                      help='memory budget of feeds kept by --serve in MB '
+                           '(default: %(default)s)')
+  parser.add_argument('--profile', action='store_true',
+                      help='print times and peak memory usages of phases and '
+                           'sections to standard error')
+  parser.add_argument('--profile-json', metavar='FILE',
+                      help='also write the profile to FILE in JSON')
   args = parser.parse_args()
+  if args.top_capacity is not None and args.top_capacity < 1:
+    parser.error('--top-capacity must be positive')
+  if args.backend == 'sqlite':
+    if args.top_capacity is not None:
+      parser.error('--top-capacity can not be used with --backend sqlite')
+    if args.search is not None:
+      parser.error('--search can not be used with --backend sqlite')
+
+  args.profile = args.profile or bool(args.profile_json)
+
+  files = xml_files(args.xml)
+  if not files:
+    parser.error('no XML files found')
+  if args.serve:
+    serve(args.serve, Server(args.xml, args.serve_memory << 20, args.jobs))
+    return
 
-  filename = args.xml
-  filename_cache = filename + '.cache'
-  cache = shelve.open(filename_cache)
-  if 'feed' in cache and cache.get('CACHE_VERSION', None) == CACHE_VERSION:
-    f = cache['feed']
+  profile = Profile(args.profile)
+  if len(files) == 1:
+    report(files[0], args, args.jobs, profile)
   else:
-    d = etree.parse(filename)
-    r = d.getroot()
-    f, _ = to_dict(r)
-    cache['feed'] = f
-    cache['CACHE_VERSION'] = CACHE_VERSION
-  if args.dump:
-    with open(filename + '.dump.py', 'w') as dump_file:
-      import pprint
-      pprint.pprint(f, dump_file)
-
-  # filter
-  if args.pubdate:
-    d1, d2 = args.pubdate
-    for key in ('post', 'page', 'comment'):
-      if d1:
-        f[key] = list(p for p in f[key] if p['published'] >= d1)
-      if d2:
-        f[key] = list(p for p in f[key] if p['published'] <= d2)
-
-  # remove comments which don't have post to belong to
-  post_ids = list(p['id'] for p in f['post'])
-  f['comment'] = list(c for c in f['comment'] if c['in-reply-to']['ref'] in post_ids)
-  del post_ids
-
-  # generate list of labels
-  f['label'] = list(set(chain.from_iterable(p.get('label', []) for p in f['post'])))
-
-  print('= {:=<37s}{:=>37s} ='.format('{} {} '.format(__program__, __version__), ' ' + __website__))
-  print()
-  print(' ', f['title'], 'by', f['author']['name'])
-  print(' ', ddd(next(s for s in f['settings'] if 'BLOG_DESCRIPTION' in s['id'])['content'], 76))
-
-  s_filter(args)
+    if args.base:
+      parser.error('--base can only be used with one XML file')
 
-  s_general(f)
-  s_posts(f)
-  s_comments(f)
-  s_posts_comments(f)
-  s_punchcard(f)
-  s_labels(f)
+    if args.jobs == 1:
+      results = (report_network(filename, args) for filename in files)
+    else:
+      from concurrent.futures import ProcessPoolExecutor
+      executor = ProcessPoolExecutor(args.jobs or None)
+      results = executor.map(report_network, files, repeat(args))
+    networks = [Network(args.top_capacity) for _ in args.pubdate or [None]]
+    for output, ns, p in results:
+      print(output)
+      for network, n in zip(networks, ns):
+        network.update(n)
+      profile.update(p)
+    if args.jobs != 1:
+      executor.shutdown()
+    for pubdate, network in zip(args.pubdate or [None], networks):
+      s_filter(pubdate)
+      with profile.phase('section network'):
+        s_network(network)
+
+  if args.profile:
+    profile.print_table()
+  if args.profile_json:
+    import json
+    with open(args.profile_json, 'w') as profile_file:
+      json.dump(profile.as_list(), profile_file, indent=2)
 
 
 if __name__ == '__main__':
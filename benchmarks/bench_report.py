@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# Benchmark of loading and reporting synthetic exports of several sizes
+#
+# Run from the top directory, sizes are numbers of entries:
+#
+#   PYTHONPATH=. benchmarks/bench_report.py 1000 10000 100000
+#
+# Exports are generated by gen_export.py into a temporary directory, or into
+# --dir, where they are reused by later runs.
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+
+import bea
+from gen_export import sizes, write_export
+
+REPEAT = 3
+
+
+def best(func, repeat=REPEAT):
+  '''Return the best wall time of calling func in seconds'''
+
+  times = []
+  for _ in range(repeat):
+    t = time.perf_counter()
+    func()
+    times.append(time.perf_counter() - t)
+  return min(times)
+
+
+def bench(filename):
+  '''Return an OrderedDict of benchmark name to seconds of an export'''
+
+  results = OrderedDict()
+  filename_cache = filename + '.cache'
+  if os.path.exists(filename_cache):
+    os.remove(filename_cache)
+
+  t = time.perf_counter()
+  f = bea.load_feed(filename)
+  results['cold parse'] = time.perf_counter() - t
+  results['save cache'] = best(lambda: bea.save_cache(filename_cache, f), 1)
+  results['warm load'] = best(lambda: bea.load_cache(filename_cache, filename))
+
+  f = bea.load_cache(filename_cache, filename)
+  published = f['post'].published
+  d1, d2 = sorted(published)[len(published) // 4], max(published)
+  results['select'] = best(f.select)
+  results['select pubdate'] = best(lambda: f.select(d1, d2))
+
+  for name, func in bea.SECTIONS.items():
+    def report():
+      with contextlib.redirect_stdout(io.StringIO()):
+        func(f.select())
+    results['section ' + name] = best(report)
+  return results
+
+
+def main():
+
+  parser = argparse.ArgumentParser(description='Benchmark bea on synthetic exports')
+  parser.add_argument('sizes', type=int, nargs='*', default=[1000, 10000, 100000],
+                      metavar='N', help='numbers of entries of exports')
+  parser.add_argument('--dir', help='directory to keep and reuse exports in')
+  parser.add_argument('--json', metavar='FILE', help='write results to FILE in JSON')
+  args = parser.parse_args()
+
+  directory = args.dir or tempfile.mkdtemp(prefix='bea-bench-')
+  os.makedirs(directory, exist_ok=True)
+  results = OrderedDict()
+  try:
+    for n in args.sizes:
+      filename = os.path.join(directory, 'export-%d.xml' % n)
+      if not os.path.exists(filename):
+        with open(filename, 'w') as out:
+          write_export(out, **sizes(n))
+      results[n] = bench(filename)
+  finally:
+    if not args.dir:
+      shutil.rmtree(directory)
+
+  names = list(next(iter(results.values())))
+  print('{:24}'.format('seconds') + ''.join('{:>12,}'.format(n) for n in results))
+  for name in names:
+    print('{:24}'.format(name) + ''.join('{:12.4f}'.format(r[name]) for r in results.values()))
+
+  if args.json:
+    import json
+    with open(args.json, 'w') as json_file:
+      json.dump([dict(entries=n, **r) for n, r in results.items()], json_file, indent=2)
+
+
+if __name__ == '__main__':
+  main()
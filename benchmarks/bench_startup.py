@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Benchmark of import time and warm start against a time budget
+#
+# Run from the top directory:
+#
+#   PYTHONPATH=. benchmarks/bench_startup.py
+#
+# Warm start is importing bea and loading a valid cache in a new interpreter,
+# less the interpreter's own startup.  It exits with status 1 if the warm start
+# is over the budget or lxml or NumPy is imported.
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import bea
+from gen_export import sizes, write_export
+
+REPEAT = 5
+WARM_START = '''
+import sys
+import bea
+assert bea.load_cache(sys.argv[1] + '.cache', sys.argv[1]) is not None
+# a lazily imported module which hasn't been executed isn't of module type
+heavy = [name for name in ('lxml.etree', 'lxml.html', 'numpy')
+         if type(sys.modules.get(name)).__name__ == 'module']
+sys.exit(', '.join(heavy) or None)
+'''
+
+
+def best(args, env):
+  '''Return the best wall time of running args in seconds'''
+
+  times = []
+  for _ in range(REPEAT):
+    t = time.perf_counter()
+    subprocess.check_call(args, env=env)
+    times.append(time.perf_counter() - t)
+  return min(times)
+
+
+def main():
+
+  parser = argparse.ArgumentParser(description='Benchmark bea startup')
+  parser.add_argument('--budget', type=float, default=100, metavar='MS',
+                      help='warm start budget in milliseconds '
+                           '(default: %(default)s)')
+  parser.add_argument('--entries', type=int, default=10000, metavar='N',
+                      help='number of entries of the export '
+                           '(default: %(default)s)')
+  args = parser.parse_args()
+
+  # bytecode is cached as on installed systems
+  env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(bea.__file__)))
+  env.pop('PYTHONDONTWRITEBYTECODE', None)
+  with tempfile.TemporaryDirectory(prefix='bea-bench-') as directory:
+    filename = os.path.join(directory, 'export.xml')
+    with open(filename, 'w') as out:
+      write_export(out, **sizes(args.entries))
+    bea.save_cache(filename + '.cache', bea.load_feed(filename))
+
+    python = best([sys.executable, '-c', 'pass'], env)
+    imports = best([sys.executable, '-c', 'import bea'], env) - python
+    try:
+      warm = best([sys.executable, '-c', WARM_START, filename], env) - python
+    except subprocess.CalledProcessError:
+      print('heavy modules are imported on warm start')
+      sys.exit(1)
+
+  print('{:<20} {:8.1f} ms'.format('python', python * 1000))
+  print('{:<20} {:8.1f} ms'.format('import bea', imports * 1000))
+  print('{:<20} {:8.1f} ms (budget {:.1f} ms)'.format('warm start', warm * 1000, args.budget))
+  if warm * 1000 > args.budget:
+    print('warm start is over budget')
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Micro-benchmark of parsing published and updated timestamps
+#
+# Run from the top directory:
+#
+#   PYTHONPATH=. benchmarks/bench_timestamp.py
+
+import datetime
+import timeit
+
+import bea
+
+TIMESTAMPS = (
+  '2012-04-16T10:20:00.000-07:00',
+  '2013-12-31T23:59:59.999-08:00',
+  '2014-06-25T02:47:45.123+08:00',
+  '2014-12-28T18:24:34.000+00:00',
+)
+NUMBER = 100000
+REPEAT = 5
+
+
+def strptime(s):
+  '''Parse timestamp s as to_dict did before parse_timestamp'''
+
+  return datetime.datetime.strptime(s.replace(':', ''), '%Y-%m-%dT%H%M%S.%f%z')
+
+
+def bench(func):
+  '''Return the best time of calling func on TIMESTAMPS in microseconds'''
+
+  stmt = lambda: [func(s) for s in TIMESTAMPS]
+  best = min(timeit.repeat(stmt, number=NUMBER, repeat=REPEAT))
+  return best / NUMBER / len(TIMESTAMPS) * 1e6
+
+
+def main():
+
+  for s in TIMESTAMPS:
+    assert bea.parse_timestamp(s) == strptime(s) == bea.slice_timestamp(s), s
+
+  base = bench(strptime)
+  print('{:<20} {:>8} {:>8}'.format('parser', 'us/call', 'speedup'))
+  for name, func in (
+      ('strptime', strptime),
+      ('parse_timestamp', bea.parse_timestamp),
+      ('slice_timestamp', bea.slice_timestamp),
+  ):
+    t = base if func is strptime else bench(func)
+    print('{:<20} {:8.3f} {:7.1f}x'.format(name, t, base / t))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# Check that every way of computing a report gives the same report
+#
+# Run from the top directory:
+#
+#   PYTHONPATH=. benchmarks/check_equivalence.py
+#
+# A synthetic export is reported in new processes without NumPy, with NumPy for
+# all sizes, with more than one job, reusing a base cache, and with the sqlite
+# backend, each in its own directory.  Each is reported as a whole from the XML
+# file, in pubdate windows with odd UTC offsets, and as a whole again from the
+# cache or the database.  It exits with status 1 if any report differs from the
+# one without NumPy.
+
+import argparse
+import difflib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from gen_export import sizes, write_export
+
+TOP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# NUMPY_MIN_SIZE of bea is set before main is run
+RUN = '''
+import sys
+sys.path.insert(0, sys.argv[1])
+import bea
+bea.NUMPY_MIN_SIZE = int(sys.argv[2])
+sys.argv[:3] = ['bea.py']
+bea.main()
+'''
+NO_NUMPY = 2 ** 62
+PUBDATES = ['--pubdate', '2009-03-01T00:00:00+0545', '2012-06-30T12:30:00-0330',
+            '--pubdate', '', '2011-01-01T00:00:00+0530']
+VARIANTS = (
+  ('numpy', 0, []),
+  ('jobs', NO_NUMPY, ['-j', '2']),
+  ('base', NO_NUMPY, ['--base', 'base.xml.cache']),
+  ('sqlite', NO_NUMPY, ['--backend', 'sqlite']),
+  ('sqlite numpy jobs', 0, ['--backend', 'sqlite', '-j', '2']),
+)
+
+
+def run(directory, numpy_min_size, args):
+  '''Return the report of bea.py with args run in directory'''
+
+  return subprocess.check_output(
+    [sys.executable, '-c', RUN, TOP, str(numpy_min_size)] + args,
+    cwd=directory, universal_newlines=True)
+
+
+def reports(directory, numpy_min_size, args):
+  '''Return the reports of export.xml in directory, cold, in pubdate windows,
+  and warm'''
+
+  args = args + ['export.xml']
+  return [run(directory, numpy_min_size, args),
+          run(directory, numpy_min_size, args + PUBDATES),
+          run(directory, numpy_min_size, args)]
+
+
+def main():
+
+  parser = argparse.ArgumentParser(description='Check reports of bea are the same by all means')
+  parser.add_argument('entries', type=int, nargs='?', default=2000, metavar='N',
+                      help='number of entries of the export')
+  parser.add_argument('--seed', type=int, default=1)
+  args = parser.parse_args()
+
+  kwargs = sizes(args.entries)
+  directory = tempfile.mkdtemp(prefix='bea-check-')
+  try:
+    source = os.path.join(directory, 'export.xml')
+    with open(source, 'w') as out:
+      write_export(out, seed=args.seed, **kwargs)
+    # the same posts, drafts, and pages, but only the earlier half of comments
+    base = os.path.join(directory, 'base.xml')
+    with open(base, 'w') as out:
+      write_export(out, seed=args.seed, **dict(kwargs, comments=kwargs['comments'] // 2))
+
+    def prepare(name):
+
+      path = os.path.join(directory, name.replace(' ', '-'))
+      os.mkdir(path)
+      shutil.copy(source, path)
+      shutil.copy(base, path)
+      run(path, NO_NUMPY, ['-s', 'general', 'base.xml'])
+      return path
+
+    expected = reports(prepare('expected'), NO_NUMPY, [])
+    failed = 0
+    for name, numpy_min_size, options in VARIANTS:
+      results = reports(prepare(name), numpy_min_size, options)
+      for what, expect, result in zip(('cold', 'pubdate', 'warm'), expected, results):
+        if result == expect:
+          print('{:20} {:8} ok'.format(name, what))
+          continue
+        failed += 1
+        print('{:20} {:8} differs:'.format(name, what))
+        diff = difflib.unified_diff(expect.splitlines(), result.splitlines(),
+                                    'expected', name, lineterm='')
+        for line in list(diff)[:40]:
+          print('  ' + line)
+  finally:
+    shutil.rmtree(directory)
+
+  sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Check the bounds of SpaceSaving counts on random streams
+#
+# Run from the top directory:
+#
+#   PYTHONPATH=. benchmarks/check_space_saving.py
+#
+# For each seed, a random stream is counted by one SpaceSaving, and its random
+# parts are counted by their own SpaceSaving, merged by update with items mapped
+# as Network merges commenters of Feeds, then the last part is added.  Every
+# count must be at least the true count and at most its error over it, and an
+# item which isn't counted must not occur more than the error of the summary.
+# It exits with status 1 if any bound doesn't hold.
+
+import argparse
+import random
+import sys
+from collections import Counter
+
+from bea import SpaceSaving
+
+
+def violations(summary, stream):
+  '''Return a list of descriptions of the bounds summary breaks for stream'''
+
+  true = Counter(stream)
+  found = []
+  if summary.total != len(stream):
+    found.append('total %d of %d items' % (summary.total, len(stream)))
+  for item, (count, error) in summary.counts.items():
+    if not count - error <= true[item] <= count:
+      found.append('%r counted %d (±%d), occurs %d' % (item, count, error, true[item]))
+  for item, count in true.items():
+    if item not in summary.counts and count > summary.error:
+      found.append('%r not counted, occurs %d > %d' % (item, count, summary.error))
+  return found
+
+
+def check(seed):
+  '''Return a list of descriptions of broken bounds of a random stream'''
+
+  rng = random.Random(seed)
+  capacity = rng.randint(1, 10)
+  items = rng.randint(1, 30)
+  # skewed, so a few items are frequent
+  stream = [int(items * rng.random() ** 2) for _ in range(rng.randint(0, 300))]
+
+  found = ['add: ' + v for v in violations(SpaceSaving(capacity, stream), stream)]
+
+  merged = SpaceSaving(capacity)
+  cuts = sorted(rng.randint(0, len(stream)) for _ in range(rng.randint(0, 5)))
+  for start, stop in zip([0] + cuts, cuts + [len(stream)]):
+    if stop == len(stream) and cuts:
+      # the last part is added after the merges
+      for item in stream[start:stop]:
+        merged.add(item)
+      break
+    # parts count items by their own IDs, which are mapped back as merged
+    offset = rng.randint(0, 1000)
+    part = SpaceSaving(rng.randint(1, 10), [item + offset for item in stream[start:stop]])
+    merged.update(part, lambda item: item - offset)
+  found.extend('update: ' + v for v in violations(merged, stream))
+  return found
+
+
+def main():
+
+  parser = argparse.ArgumentParser(description='Check the bounds of SpaceSaving counts')
+  parser.add_argument('seeds', type=int, nargs='?', default=1000, metavar='N',
+                      help='number of random streams')
+  args = parser.parse_args()
+
+  failed = 0
+  for seed in range(args.seeds):
+    found = check(seed)
+    if found:
+      failed += 1
+      print('seed {}:'.format(seed))
+      for v in found[:10]:
+        print('  ' + v)
+  print('{} of {} streams break the bounds'.format(failed, args.seeds))
+  sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+  main()
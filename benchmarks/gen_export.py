@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# Generator of synthetic Blogger export XML files
+#
+# Run from the top directory, for example, an export of 10,000 entries:
+#
+#   benchmarks/gen_export.py --posts 2000 --comments 7700 > export.xml
+
+import argparse
+import datetime
+import random
+import sys
+from xml.sax.saxutils import escape, quoteattr
+
+BLOG = 'tag:blogger.com,1999:blog-1234567890'
+AUTHOR = 'Yu-Jie Lin'
+WORDS = (
+  "the of and to in is was it for on that with as by at from this be or an "
+  "python linux bash vim gentoo blog code script release bug fix error can't "
+  "don't isn't well-known x-window 3.14 e.g. version kernel package update "
+  "install config file terminal screen window keyboard mouse font color"
+).split()
+TZS = tuple(datetime.timezone(datetime.timedelta(hours=h))
+            for h in (-8, -7, 0, 8))
+NOW = datetime.datetime(2014, 12, 28, 10, 0, 0, 123000, TZS[0])
+START = datetime.datetime(2008, 3, 1, tzinfo=TZS[0])
+KIND = ("<category scheme='http://schemas.google.com/g/2005#kind' "
+        "term='http://schemas.google.com/blogger/2008/kind#%s'/>")
+LABEL = "<category scheme='http://www.blogger.com/atom/ns#' term=%s/>"
+DRAFT = ("<app:control xmlns:app='http://purl.org/atom/app#'>"
+         "<app:draft>yes</app:draft></app:control>")
+
+
+def timestamp(dt):
+  '''Return dt formatted as Blogger does, with milliseconds'''
+
+  s = dt.strftime('%Y-%m-%dT%H:%M:%S.%%03d%z') % (dt.microsecond // 1000)
+  return s[:-2] + ':' + s[-2:]
+
+
+def author(name):
+
+  return ("<author><name>%s</name><uri>http://example.com/%s</uri>"
+          "<email>noreply@blogger.com</email>"
+          "<gd:image rel='http://schemas.google.com/g/2005#thumbnail' "
+          "width='16' height='16' "
+          "src='http://img1.blogblog.com/img/b16-rounded.gif'/></author>"
+          % (escape(name), quoteattr(name)[1:-1]))
+
+
+def sentence(rng, n):
+
+  words = [rng.choice(WORDS) for _ in range(n)]
+  words[0] = words[0].capitalize()
+  return ' '.join(words) + '.'
+
+
+def html_content(rng, paragraphs):
+  '''Return HTML of a post or a comment with a number of paragraphs'''
+
+  parts = []
+  for _ in range(paragraphs):
+    r = rng.random()
+    if r < 0.1:
+      parts.append('<pre><code>%s</code></pre>' % escape(
+        '\n'.join('$ %s --%s' % (rng.choice(WORDS), rng.choice(WORDS))
+                  for _ in range(rng.randint(1, 5)))))
+    elif r < 0.2:
+      parts.append('<ul>%s</ul>' % '\n'.join(
+        '<li>%s</li>' % sentence(rng, rng.randint(2, 8))
+        for _ in range(rng.randint(2, 5))))
+    elif r < 0.25:
+      parts.append('<div class="separator"><a href="http://example.com/%d.png">'
+                   '<img border="0" src="http://example.com/%d.png" /></a></div>'
+                   % (rng.randint(0, 9999), rng.randint(0, 9999)))
+    else:
+      words = sentence(rng, rng.randint(5, 60)).split(' ')
+      for _ in range(rng.randint(0, 3)):
+        i = rng.randrange(len(words))
+        tag = rng.choice(('b', 'i', 'code'))
+        words[i] = '<%s>%s</%s>' % (tag, words[i], tag)
+      if rng.random() < 0.3:
+        i = rng.randrange(len(words))
+        words[i] = '<a href="http://example.com/%s">%s</a>' % (words[i], words[i])
+      parts.append('<p>%s</p>' % ' '.join(words))
+  return '\n'.join(parts)
+
+
+def write_export(out, posts=1000, comments=4000, labels=30, drafts=30, pages=3,
+                 commenters=100, seed=1):
+  '''Write a Blogger export XML file of given numbers of entries to out
+
+  Posts are written newest first as Blogger does, followed by drafts, pages
+  and comments.  Comments reply to random posts, a few reply to pages.'''
+
+  rng = random.Random(seed)
+  labels = ['label%03d' % i for i in range(labels)]
+  commenters = ['Anonymous'] + ['User%d' % i for i in range(commenters)]
+
+  def random_time(start=START, end=NOW):
+    '''Return a random time in milliseconds from start to end in a random
+    time zone'''
+
+    ms = int((end - start).total_seconds() * 1000)
+    dt = start + datetime.timedelta(milliseconds=rng.randint(0, ms))
+    return dt.astimezone(rng.choice(TZS))
+
+  def random_published():
+    '''Return a random published time of a post or a page, which Blogger
+    saves in seconds'''
+
+    return random_time().replace(microsecond=0)
+
+  def entry(_id, kind, published, updated, title, content, extra='', name=AUTHOR):
+
+    out.write("<entry><id>%s</id><published>%s</published>"
+              "<updated>%s</updated>%s<title type='text'>%s</title>"
+              "<content type='html'>%s</content>%s%s</entry>"
+              % (_id, timestamp(published), timestamp(updated), KIND % kind,
+                 escape(title), escape(content), author(name), extra))
+
+  out.write("<?xml version='1.0' encoding='UTF-8'?>"
+            "<?xml-stylesheet href=\"http://www.blogger.com/styles/atom.css\" "
+            "type=\"text/css\"?>"
+            "<feed xmlns='http://www.w3.org/2005/Atom' "
+            "xmlns:openSearch='http://a9.com/-/spec/opensearchrss/1.0/' "
+            "xmlns:gd='http://schemas.google.com/g/2005' "
+            "xmlns:thr='http://purl.org/syndication/thread/1.0' "
+            "xmlns:georss='http://www.georss.org/georss'>")
+  out.write("<id>%s</id><updated>%s</updated>"
+            "<title type='text'>Synthetic Blog</title>"
+            "<link rel='http://schemas.google.com/g/2005#feed' "
+            "type='application/atom+xml' "
+            "href='http://example.com/feeds/posts/default'/>%s"
+            "<generator version='7.00' uri='http://www.blogger.com'>Blogger"
+            "</generator><openSearch:totalResults>%d</openSearch:totalResults>"
+            % (BLOG, timestamp(NOW), author(AUTHOR),
+               posts + comments + drafts + pages))
+
+  for name, value in (('BLOG_NAME', 'Synthetic Blog'),
+                      ('BLOG_DESCRIPTION', 'A blog of <b>synthetic</b> posts')):
+    out.write("<entry><id>%s.settings.%s</id><published>%s</published>"
+              "<updated>%s</updated>%s<title type='text'></title>"
+              "<content type='text'>%s</content>%s</entry>"
+              % (BLOG, name, timestamp(NOW), timestamp(NOW), KIND % 'settings',
+                 escape(value), author(AUTHOR)))
+  entry(BLOG + '.layout', 'template', NOW, NOW, 'Template',
+        '<html><body><b:section id="main"/></body></html>')
+
+  post_times = sorted((random_published() for _ in range(posts)), reverse=True)
+  for i, published in enumerate(post_times):
+    updated = published
+    if rng.random() < 0.3:
+      updated = random_time(published,
+                            min(published + datetime.timedelta(seconds=1e7), NOW))
+    categories = ''.join(LABEL % quoteattr(label) for label in
+                         rng.sample(labels, min(len(labels), rng.randint(0, 4))))
+    entry('%s.post-%d' % (BLOG, i), 'post', published, updated,
+          sentence(rng, rng.randint(2, 8))[:-1],
+          html_content(rng, rng.randint(1, 8)),
+          "<link rel='replies' type='text/html' href='http://example.com/'/>"
+          '<thr:total>0</thr:total>' + categories)
+
+  for i in range(drafts):
+    published = random_published()
+    entry('%s.post-%d' % (BLOG, posts + i), 'post', published, published,
+          sentence(rng, rng.randint(2, 8))[:-1],
+          html_content(rng, rng.randint(0, 3)), DRAFT)
+
+  for i in range(pages):
+    published = random_published()
+    entry('%s.page-%d' % (BLOG, i), 'page', published, published,
+          'Page %d' % i, html_content(rng, rng.randint(1, 5)))
+
+  for i in range(comments):
+    if pages and rng.random() < 0.02:
+      ref, published = '%s.page-%d' % (BLOG, rng.randrange(pages)), START
+    elif posts:
+      post = rng.randrange(posts)
+      ref, published = '%s.post-%d' % (BLOG, post), post_times[post]
+    else:
+      break
+    published = random_time(published)
+    entry('%s.post-%d' % (BLOG, posts + drafts + i), 'comment', published,
+          published, 'c', html_content(rng, rng.randint(1, 3)),
+          "<thr:in-reply-to href='http://example.com/' ref='%s' "
+          "type='text/html'/>" % ref, rng.choice(commenters))
+
+  out.write('</feed>')
+
+
+def sizes(entries):
+  '''Return keyword arguments of write_export for a number of entries'''
+
+  posts = max(1, entries // 5)
+  drafts = posts // 30
+  pages = min(10, posts // 100)
+  return dict(posts=posts, drafts=drafts, pages=pages,
+              comments=max(0, entries - posts - drafts - pages),
+              labels=max(5, min(500, posts // 20)),
+              commenters=max(10, min(100000, entries // 50)))
+
+
+def main():
+
+  parser = argparse.ArgumentParser(
+    description='Write a synthetic Blogger export XML file to standard output')
+  parser.add_argument('-n', '--entries', type=int, metavar='N',
+                      help='total number of entries, overrides the numbers '
+                           'of posts, comments, etc. in usual proportions')
+  parser.add_argument('--posts', type=int, default=1000)
+  parser.add_argument('--comments', type=int, default=4000)
+  parser.add_argument('--labels', type=int, default=30)
+  parser.add_argument('--drafts', type=int, default=30)
+  parser.add_argument('--pages', type=int, default=3)
+  parser.add_argument('--commenters', type=int, default=100)
+  parser.add_argument('--seed', type=int, default=1)
+  args = parser.parse_args()
+
+  kwargs = dict((k, getattr(args, k)) for k in
+                ('posts', 'comments', 'labels', 'drafts', 'pages', 'commenters'))
+  if args.entries is not None:
+    kwargs = sizes(args.entries)
+  write_export(sys.stdout, seed=args.seed, **kwargs)
+
+
+if __name__ == '__main__':
+  main()
@@ -257,7 +257,7 @@ classifiers = [
   'License :: OSI Approved :: MIT License',
   'Natural Language :: English',
   'Operating System :: POSIX :: Linux',
-  'Programming Language :: Python :: 3.3',
+  'Programming Language :: Python :: 3.4',
   'Topic :: Text Processing',
 ]
 